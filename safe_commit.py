@@ -7,15 +7,24 @@ import subprocess
 import sys
 from datetime import datetime
 
-def run_git_command(cmd, description):
-    """Run a git command safely"""
+def run_git_command(argv, description, capture=True, stdin_data=None):
+    """Run a git command safely
+
+    argv is passed straight to git without a shell. With capture=False
+    stdout is discarded instead of piped back, for commands whose output
+    is never shown. stdin_data, if given, is fed to the command's stdin.
+    """
     try:
         print(f"🔧 {description}...")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(
+            argv, text=True, input=stdin_data,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
         
         if result.returncode == 0:
             print(f"✅ {description} successful")
-            if result.stdout.strip():
+            if result.stdout and result.stdout.strip():
                 print(f"   Output: {result.stdout.strip()}")
             return True
         else:
@@ -25,13 +34,43 @@ def run_git_command(cmd, description):
         print(f"❌ {description} error: {e}")
         return False
 
+def git_status_paths():
+    """Return every changed or untracked path from one git status call, or None on failure"""
+    try:
+        print("🔧 Git status check...")
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "-z", "--untracked-files=all"],
+            capture_output=True, text=True
+        )
+        
+        if result.returncode != 0:
+            print(f"❌ Git status check failed: {result.stderr}")
+            return None
+    except Exception as e:
+        print(f"❌ Git status check error: {e}")
+        return None
+    
+    # -z entries are "XY path"; renames and copies are followed by the source path
+    paths = []
+    entries = iter(result.stdout.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        paths.append(entry[3:])
+        if entry[0] in "RC":
+            paths.append(next(entries))
+    
+    print(f"✅ Git status check successful: {len(paths)} path(s) to stage")
+    return paths
+
 def main():
     print("🧠 GentleΩ Safe Git Commit")
     print("=" * 50)
     
     # Check git status first
     print("📋 Checking current git status...")
-    if not run_git_command("git status --porcelain", "Git status check"):
+    changed_paths = git_status_paths()
+    if changed_paths is None:
         print("❌ Git status check failed")
         return
     
@@ -42,23 +81,29 @@ def main():
     print(f"🌿 Creating snapshot branch: {branch_name}")
     
     # Create and switch to new branch
-    if not run_git_command(f"git checkout -b {branch_name}", f"Create branch {branch_name}"):
+    if not run_git_command(["git", "checkout", "-b", branch_name], f"Create branch {branch_name}"):
         print("❌ Failed to create branch")
         return
     
-    # Add all changes
-    if not run_git_command("git add .", "Stage all changes"):
+    # Stage the paths found above in a single update-index process
+    # (--remove picks up deletions, as "git add ." would)
+    if not run_git_command(
+        ["git", "update-index", "--add", "--remove", "-z", "--stdin"],
+        "Stage all changes",
+        capture=False,
+        stdin_data="".join(f"{path}\0" for path in changed_paths)
+    ):
         print("❌ Failed to stage changes")
         return
     
     # Commit with descriptive message
     commit_msg = "GentleΩ HQ: switched from demo to live DB mode + fixed Pylance pathing"
-    if not run_git_command(f'git commit -m "{commit_msg}"', "Commit changes"):
+    if not run_git_command(["git", "commit", "-m", commit_msg], "Commit changes"):
         print("❌ Failed to commit changes")
         return
     
     # Show what was committed
-    run_git_command("git show --stat HEAD", "Show commit summary")
+    run_git_command(["git", "show", "--stat", "HEAD"], "Show commit summary")
     
     print("\n" + "=" * 50)
     print("✅ Safe commit completed!")
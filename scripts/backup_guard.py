@@ -4,18 +4,35 @@ Storage and Backup Guard System for GentleΩ
 Ensures all volumes resolve to D: drive and manages automated backups
 """
 
+import ctypes
 import os
+import re
 import sys
 import subprocess
 import json
 import shutil
+import stat
+import gzip
 import hashlib
 import logging
+import mmap
+import secrets
+import tempfile
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 import psutil
+import requests
 import yaml
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
+
+# Prefer the libyaml-backed loader, it is an order of magnitude faster
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Configure logging
 logging.basicConfig(
@@ -28,23 +45,118 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Remote-control address of the long-lived rclone daemon
+RCLONE_RC_ADDR = '127.0.0.1:5572'
+
+# A cloud sync still running after this long is stopped, so the next hourly run isn't blocked
+RCLONE_SYNC_TIMEOUT = 50 * 60
+
+# Backup directory names: YYYYMMDD or YYYYMMDD_HHMMSS
+BACKUP_DIR_PATTERN = re.compile(r'^(\d{4})(\d{2})(\d{2})(?:_(\d{2})(\d{2})(\d{2}))?$')
+
+# Files larger than one block are hashed as a tree of per-block MD5s
+PARALLEL_DIGEST_BLOCK = 64 << 20
+
+@lru_cache(maxsize=4096)
+def resolve_drive(path: str) -> Tuple[str, str]:
+    """Return the absolute path and its upper-cased drive letter"""
+    path = os.path.abspath(path)
+    return path, os.path.splitdrive(path)[0].upper()
+
+def fast_copy(src: str, dst: str) -> str:
+    """Copy a file without bouncing its data through Python
+
+    Uses CopyFileExW on Windows; elsewhere shutil.copy2 already copies
+    in-kernel via sendfile/copy_file_range.
+    """
+    if os.name == 'nt':
+        if not ctypes.windll.kernel32.CopyFileExW(src, dst, None, None, None, 0):
+            raise ctypes.WinError()
+        return dst
+    return shutil.copy2(src, dst)
+
+def _scan_compose_volumes(content: str):
+    """Collect (service, volume) pairs from the YAML event stream
+
+    Only tracks the current key at each depth, so unrelated sections
+    (environment, labels, ...) are never materialised. Returns None as soon as
+    an alias or merge key appears, since resolving those needs the full tree.
+    """
+    # One frame per open collection: is it a mapping, its current key, and
+    # whether the next child node is a key or a value
+    stack = []
+    pairs = []
+    
+    def finish_node(scalar=None):
+        if stack and stack[-1]['mapping']:
+            frame = stack[-1]
+            if frame['want_key']:
+                frame['key'] = scalar
+            frame['want_key'] = not frame['want_key']
+    
+    for event in yaml.parse(content, Loader=SafeLoader):
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            stack.append({
+                'mapping': isinstance(event, yaml.MappingStartEvent),
+                'key': None,
+                'want_key': True
+            })
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            stack.pop()
+            finish_node()
+        elif isinstance(event, yaml.ScalarEvent):
+            if stack and stack[-1]['mapping'] and stack[-1]['want_key'] and event.value == '<<':
+                return None
+            if (len(stack) == 4 and not stack[3]['mapping']
+                    and stack[0]['mapping'] and stack[0]['key'] == 'services'
+                    and stack[1]['mapping']
+                    and stack[2]['mapping'] and stack[2]['key'] == 'volumes'):
+                pairs.append((stack[1]['key'], event.value))
+            finish_node(event.value)
+        elif isinstance(event, yaml.AliasEvent):
+            return None
+    
+    return pairs
+
+def iter_compose_volumes(content: str) -> Iterator[Tuple[str, str]]:
+    """Yield (service, volume) pairs for the string entries of services.<name>.volumes
+
+    Uses the event-stream scan when it can; files with anchors/aliases or
+    merge keys fall back to a full load so aliased volumes are still checked.
+    """
+    pairs = _scan_compose_volumes(content)
+    if pairs is not None:
+        yield from pairs
+        return
+    
+    compose_data = yaml.load(content, Loader=SafeLoader) or {}
+    for service_name, service_config in (compose_data.get('services') or {}).items():
+        for volume in (service_config or {}).get('volumes') or []:
+            if isinstance(volume, str):
+                yield service_name, volume
+
 class StorageGuard:
     """Verify and enforce D: drive only policy"""
     
     def __init__(self):
-        self.allowed_drives = ['D:', 'D:\\']
-        self.forbidden_drives = ['C:', 'C:\\']
+        # splitdrive() yields bare 'X:' drives, so a set lookup is exact
+        self.allowed_drives = {'D:'}
+        self.forbidden_drives = {'C:'}
+        
+        # Extracted volumes per compose file, reused while (mtime, size) match.
+        # The version suffix changes whenever extraction does, so entries from
+        # an older scanner are never trusted
+        self.compose_index_file = Path("D:/GentleOmega/cache/compose_index_v2.json")
     
     def verify_path(self, path: str) -> bool:
         """Verify path is on allowed drive"""
-        path = os.path.abspath(path)
-        drive = os.path.splitdrive(path)[0].upper()
+        path, drive = resolve_drive(path)
         
-        if any(drive.startswith(forbidden) for forbidden in self.forbidden_drives):
+        if drive in self.forbidden_drives:
             logger.error(f"FORBIDDEN PATH DETECTED: {path} - C: drive access not allowed")
             return False
         
-        if not any(drive.startswith(allowed) for allowed in self.allowed_drives):
+        if drive not in self.allowed_drives:
             logger.warning(f"Path not on approved D: drive: {path}")
             return False
         
@@ -58,25 +170,67 @@ class StorageGuard:
         if not compose_dir.exists():
             return violations
         
+        cached_index = self.load_compose_index()
+        compose_index = {}
+        
         for compose_file in compose_dir.glob("*.yml"):
             try:
-                with open(compose_file, 'r') as f:
-                    compose_data = yaml.safe_load(f)
+                file_stat = compose_file.stat()
+                cached = cached_index.get(str(compose_file))
+                
+                if cached and cached['mtime'] == file_stat.st_mtime_ns and cached['size'] == file_stat.st_size:
+                    volumes = cached['volumes']
+                else:
+                    volumes = self.read_compose_volumes(compose_file)
                 
-                if 'services' in compose_data:
-                    for service_name, service_config in compose_data['services'].items():
-                        if 'volumes' in service_config:
-                            for volume in service_config['volumes']:
-                                if isinstance(volume, str) and ':' in volume:
-                                    host_path = volume.split(':')[0]
-                                    if not self.verify_path(host_path):
-                                        violations.append(f"{compose_file}: {service_name} -> {volume}")
+                compose_index[str(compose_file)] = {
+                    'mtime': file_stat.st_mtime_ns,
+                    'size': file_stat.st_size,
+                    'volumes': volumes
+                }
+                
+                for service_name, volume in volumes:
+                    if ':' in volume:
+                        host_path = volume.split(':')[0]
+                        if not self.verify_path(host_path):
+                            violations.append(f"{compose_file}: {service_name} -> {volume}")
                 
             except Exception as e:
                 logger.error(f"Error scanning {compose_file}: {str(e)}")
         
+        if compose_index != cached_index:
+            self.save_compose_index(compose_index)
+        
         return violations
     
+    def read_compose_volumes(self, compose_file: Path) -> List[Tuple[str, str]]:
+        """Parse a compose file and return its (service, volume) pairs"""
+        with open(compose_file, 'r') as f:
+            content = f.read()
+        
+        # Files without a volumes section cannot violate the policy
+        if 'volumes:' not in content:
+            return []
+        
+        return [list(pair) for pair in iter_compose_volumes(content)]
+    
+    def load_compose_index(self) -> Dict[str, dict]:
+        """Load the cached compose volume index, or an empty one"""
+        try:
+            with open(self.compose_index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_compose_index(self, compose_index: Dict[str, dict]) -> None:
+        """Persist the compose volume index for the next run"""
+        try:
+            self.compose_index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.compose_index_file, 'w') as f:
+                json.dump(compose_index, f)
+        except OSError as e:
+            logger.warning(f"Could not write compose index: {str(e)}")
+    
     def enforce_storage_policy(self) -> bool:
         """Enforce storage policy across all configurations"""
         violations = self.scan_compose_files()
@@ -113,20 +267,82 @@ class BackupManager:
             'gomini_data': 'D:/GentleOmega/GOmini/data',
             'gomini_models': 'D:/GentleOmega/GOmini/models'
         }
+        
+        # Small local-disk sources where gzip would only burn CPU; these are
+        # copied as-is and left uncompressed
+        self.uncompressed_sources = {'duckdb', 'configs'}
+        
+        # Windows 10 1803+ ships bsdtar as tar.exe, so no shell wrapper is needed
+        self.tar_path = shutil.which('tar') or 'tar'
+        self.pigz_path = shutil.which('pigz')
+        
+        # Background deletions started by cleanup_old_backups
+        # (rd process on Windows, rmtree future elsewhere)
+        self.pending_removals: List[Tuple[Path, object]] = []
+        
+        # rclone daemon, started on first cloud sync so auth happens once per run
+        self.rclone_process = None
+        self.rclone_auth = ('backup_guard', secrets.token_urlsafe(16))
     
     def calculate_md5(self, file_path: Path) -> str:
         """Calculate MD5 hash for integrity verification"""
-        hash_md5 = hashlib.md5()
         try:
+            # file_digest runs the read/update loop in C and releases the GIL,
+            # so several files can be hashed concurrently from threads
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+                return hashlib.file_digest(f, "md5").hexdigest()
         except Exception as e:
             logger.error(f"Error calculating MD5 for {file_path}: {str(e)}")
             return ""
     
-    def create_backup_manifest(self, backup_dir: Path, files: List[Path]) -> None:
+    def calculate_parallel_digest(self, file_path: Path, block: int = PARALLEL_DIGEST_BLOCK) -> str:
+        """Calculate MD5-of-MD5s over fixed-size blocks, hashing blocks concurrently"""
+        def hash_block(start: int) -> bytes:
+            with view[start:start + block] as chunk:
+                return hashlib.md5(chunk).digest()
+        
+        try:
+            with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                with memoryview(buf) as view:
+                    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                        digests = list(executor.map(hash_block, range(0, len(buf), block)))
+            return hashlib.md5(b"".join(digests)).hexdigest()
+        except Exception as e:
+            logger.error(f"Error calculating parallel digest for {file_path}: {str(e)}")
+            return ""
+    
+    def stream_compressed(self, cmd: List[str], output_file: Path) -> Tuple[int, str]:
+        """Stream a command's stdout straight into a gzip file, without an intermediate copy
+
+        Uses pigz on all cores when available, otherwise gzip in-process.
+        """
+        # stderr goes to temp files rather than pipes: nothing reads a pipe while
+        # stdout is streaming, so a chatty pg_dump would fill it and deadlock
+        with open(output_file, 'wb') as out, tempfile.TemporaryFile() as err:
+            source_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err)
+            
+            if self.pigz_path:
+                pigz_proc = subprocess.Popen(
+                    [self.pigz_path, '-p', str(os.cpu_count()), '-c'],
+                    stdin=source_proc.stdout, stdout=out, stderr=err
+                )
+                # Only pigz should hold the read end so the source sees SIGPIPE if pigz dies
+                source_proc.stdout.close()
+                
+                source_proc.wait()
+                pigz_proc.wait()
+                returncode = source_proc.returncode or pigz_proc.returncode
+            else:
+                with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+                    shutil.copyfileobj(source_proc.stdout, gz, 1 << 20)
+                source_proc.stdout.close()
+                returncode = source_proc.wait()
+            
+            err.seek(0)
+            return returncode, err.read().decode(errors='replace')
+    
+    def create_backup_manifest(self, backup_dir: Path, files: List[Path],
+                               manifest_name: str = 'manifest.json') -> None:
         """Create backup manifest with file hashes"""
         manifest = {
             'timestamp': datetime.now().isoformat(),
@@ -134,16 +350,38 @@ class BackupManager:
             'files': {}
         }
         
+        # Stat each file once and reuse the result for type, size and mtime
+        file_stats = {}
         for file_path in files:
-            if file_path.exists() and file_path.is_file():
-                relative_path = str(file_path.relative_to(backup_dir.parent))
-                manifest['files'][relative_path] = {
-                    'size': file_path.stat().st_size,
-                    'md5': self.calculate_md5(file_path),
-                    'modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-                }
+            try:
+                file_stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(file_stat.st_mode):
+                file_stats[file_path] = file_stat
+        
+        small_files = [file_path for file_path, file_stat in file_stats.items()
+                       if file_stat.st_size <= PARALLEL_DIGEST_BLOCK]
+        
+        # Hash files in parallel - each worker spends its time inside hashlib
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            digests = dict(zip(small_files, executor.map(self.calculate_md5, small_files)))
+        
+        for file_path, file_stat in file_stats.items():
+            relative_path = str(file_path.relative_to(backup_dir.parent))
+            entry = {'size': file_stat.st_size}
+            
+            if file_path in digests:
+                entry['md5'] = digests[file_path]
+            else:
+                # Large files already use every core, one at a time
+                entry['md5_tree'] = self.calculate_parallel_digest(file_path)
+                entry['chunk_size'] = PARALLEL_DIGEST_BLOCK
+            
+            entry['modified'] = datetime.fromtimestamp(file_stat.st_mtime).isoformat()
+            manifest['files'][relative_path] = entry
         
-        manifest_file = backup_dir / 'manifest.json'
+        manifest_file = backup_dir / manifest_name
         with open(manifest_file, 'w') as f:
             json.dump(manifest, f, indent=2)
     
@@ -158,38 +396,54 @@ class BackupManager:
         backup_dir.mkdir(parents=True, exist_ok=True)
         
         try:
+            if backup_name in self.uncompressed_sources:
+                return self.copy_directory(source_path, backup_dir, backup_name)
+            
             # Create compressed backup
             backup_file = backup_dir / f"{backup_name}.tar.gz"
             
-            cmd = [
-                'tar', '-czf', str(backup_file),
-                '-C', str(source_path.parent),
-                source_path.name
-            ]
-            
-            # Use PowerShell tar if on Windows
-            if os.name == 'nt':
+            if self.pigz_path:
+                returncode, stderr = self.stream_compressed(
+                    [self.tar_path, '-cf', '-', '-C', str(source_path.parent), source_path.name],
+                    backup_file
+                )
+            else:
+                # Fall back to tar's built-in single-threaded gzip
                 cmd = [
-                    'powershell', '-Command',
-                    f'tar -czf "{backup_file}" -C "{source_path.parent}" "{source_path.name}"'
+                    self.tar_path, '-czf', str(backup_file),
+                    '-C', str(source_path.parent),
+                    source_path.name
                 ]
+                
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                returncode, stderr = result.returncode, result.stderr
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                # Create manifest
-                self.create_backup_manifest(backup_dir, [backup_file])
+            if returncode == 0:
+                # Create manifest - one per source, since sources backed up
+                # concurrently share the same timestamped directory
+                self.create_backup_manifest(backup_dir, [backup_file], f"{backup_name}.manifest.json")
                 
                 logger.info(f"Backup created: {backup_file}")
                 return True, str(backup_file)
             else:
-                logger.error(f"Backup failed for {source}: {result.stderr}")
-                return False, result.stderr
+                logger.error(f"Backup failed for {source}: {stderr}")
+                return False, stderr
                 
         except Exception as e:
             logger.error(f"Backup error for {source}: {str(e)}")
             return False, str(e)
     
+    def copy_directory(self, source_path: Path, backup_dir: Path, backup_name: str) -> Tuple[bool, str]:
+        """Backup a directory as a plain zero-copy file copy"""
+        target = backup_dir / backup_name
+        # Re-runs and retries copy over an existing target, as the per-file loop did
+        shutil.copytree(source_path, target, copy_function=fast_copy, dirs_exist_ok=True)
+        
+        self.create_backup_manifest(backup_dir, list(target.rglob('*')), f"{backup_name}.manifest.json")
+        
+        logger.info(f"Backup copied: {target}")
+        return True, str(target)
+    
     def export_databases(self) -> Dict[str, bool]:
         """Export databases to backup location"""
         results = {}
@@ -213,14 +467,23 @@ class BackupManager:
             logger.error(f"InfluxDB export failed: {str(e)}")
             results['influxdb'] = False
         
-        # PostgreSQL export
+        # PostgreSQL export - pg_dump is piped straight into the compressor so
+        # the uncompressed dump never touches the disk
         try:
-            pg_backup_file = self.backup_root / datetime.now().strftime("%Y%m%d") / "postgresql_dump.sql"
+            pg_backup_file = self.backup_root / datetime.now().strftime("%Y%m%d") / "postgresql_dump.sql.gz"
             pg_backup_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # This would use actual PostgreSQL backup commands
-            results['postgresql'] = True
-            logger.info("PostgreSQL export scheduled")
+            cmd = [
+                'docker', 'exec', 'aitb-postgres',
+                'pg_dump', '-U', 'postgres', 'aitb'
+            ]
+            
+            returncode, stderr = self.stream_compressed(cmd, pg_backup_file)
+            results['postgresql'] = returncode == 0
+            if returncode == 0:
+                logger.info(f"PostgreSQL export created: {pg_backup_file}")
+            else:
+                logger.error(f"PostgreSQL export failed: {stderr}")
             
         except Exception as e:
             logger.error(f"PostgreSQL export failed: {str(e)}")
@@ -228,26 +491,76 @@ class BackupManager:
         
         return results
     
+    def start_rclone_daemon(self) -> None:
+        """Start rclone rcd and wait until its remote-control API answers"""
+        if self.rclone_process and self.rclone_process.poll() is None:
+            return
+        
+        user, password = self.rclone_auth
+        self.rclone_process = subprocess.Popen(
+            ['rclone', 'rcd', f'--rc-addr={RCLONE_RC_ADDR}',
+             f'--rc-user={user}', f'--rc-pass={password}'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if self.rclone_process.poll() is not None:
+                raise RuntimeError(f"rclone rcd exited with code {self.rclone_process.returncode}")
+            try:
+                requests.post(f"http://{RCLONE_RC_ADDR}/rc/noop", auth=self.rclone_auth, timeout=1)
+                return
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        
+        raise RuntimeError("rclone rcd did not become ready")
+    
+    def stop_rclone_daemon(self) -> None:
+        """Shut down the rclone daemon if it was started"""
+        if self.rclone_process and self.rclone_process.poll() is None:
+            self.rclone_process.terminate()
+            self.rclone_process.wait()
+        self.rclone_process = None
+    
     def sync_to_cloud(self, local_path: str) -> bool:
-        """Sync backups to Google Drive using rclone"""
+        """Sync backups to Google Drive using the rclone daemon"""
         try:
-            cmd = [
-                'rclone', 'copy',
-                local_path,
-                'gdrive:GentleOmega_Backups/',
-                '--transfers', '4',
-                '--checkers', '8',
-                '--progress'
-            ]
+            self.start_rclone_daemon()
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                logger.info(f"Cloud sync successful: {local_path}")
-                return True
-            else:
-                logger.error(f"Cloud sync failed: {result.stderr}")
+            # Run the copy as an rcd job and poll it, so a stuck transfer can't
+            # hold an HTTP request (and this run) open indefinitely
+            response = requests.post(
+                f"http://{RCLONE_RC_ADDR}/sync/copy",
+                auth=self.rclone_auth,
+                json={
+                    'srcFs': local_path,
+                    'dstFs': 'gdrive:GentleOmega_Backups/',
+                    '_config': {'Transfers': 4, 'Checkers': 8},
+                    '_async': True
+                },
+                timeout=30
+            )
+            if response.status_code != 200:
+                logger.error(f"Cloud sync failed: {response.text}")
                 return False
+            job = {'jobid': response.json()['jobid']}
+            
+            deadline = time.monotonic() + RCLONE_SYNC_TIMEOUT
+            while time.monotonic() < deadline:
+                status = requests.post(
+                    f"http://{RCLONE_RC_ADDR}/job/status", auth=self.rclone_auth, json=job, timeout=30
+                ).json()
+                if status.get('finished'):
+                    if status.get('success'):
+                        logger.info(f"Cloud sync successful: {local_path}")
+                        return True
+                    logger.error(f"Cloud sync failed: {status.get('error')}")
+                    return False
+                time.sleep(2)
+            
+            requests.post(f"http://{RCLONE_RC_ADDR}/job/stop", auth=self.rclone_auth, json=job, timeout=30)
+            logger.error(f"Cloud sync timed out after {RCLONE_SYNC_TIMEOUT}s: {local_path}")
+            return False
                 
         except Exception as e:
             logger.error(f"Cloud sync error: {str(e)}")
@@ -262,13 +575,14 @@ class BackupManager:
                 if not backup_dir.is_dir():
                     continue
                 
+                match = BACKUP_DIR_PATTERN.match(backup_dir.name)
+                if not match:
+                    continue
+                
                 try:
-                    backup_date = datetime.strptime(backup_dir.name, "%Y%m%d_%H%M%S")
+                    backup_date = datetime(*(int(part or 0) for part in match.groups()))
                 except ValueError:
-                    try:
-                        backup_date = datetime.strptime(backup_dir.name, "%Y%m%d")
-                    except ValueError:
-                        continue
+                    continue
                 
                 age_days = (now - backup_date).days
                 
@@ -287,40 +601,87 @@ class BackupManager:
                         should_delete = True
                 
                 if should_delete:
-                    shutil.rmtree(backup_dir)
-                    logger.info(f"Removed old backup: {backup_dir}")
+                    self.remove_backup_dir(backup_dir)
                     
         except Exception as e:
             logger.error(f"Cleanup error: {str(e)}")
     
+    def remove_backup_dir(self, backup_dir: Path) -> None:
+        """Start deleting a backup directory in a background process"""
+        backup_root = self.backup_root.resolve()
+        resolved = backup_dir.resolve()
+        if resolved == backup_root or not resolved.is_relative_to(backup_root):
+            logger.error(f"Refusing to remove path outside backup root: {backup_dir}")
+            return
+        
+        # On Windows rd walks the tree natively, far faster than per-entry
+        # Python calls there; elsewhere rmtree (fd-based, portable) runs on a thread
+        if os.name == 'nt':
+            removal = subprocess.Popen(['cmd', '/c', 'rd', '/s', '/q', str(resolved)],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            executor = ThreadPoolExecutor(max_workers=1)
+            removal = executor.submit(shutil.rmtree, resolved)
+            executor.shutdown(wait=False)
+        
+        self.pending_removals.append((backup_dir, removal))
+    
+    def wait_for_removals(self) -> None:
+        """Wait for background deletions and report their outcome"""
+        for backup_dir, removal in self.pending_removals:
+            if isinstance(removal, subprocess.Popen):
+                error = f"exit code {removal.returncode}" if removal.wait() != 0 else None
+            else:
+                error = removal.exception()
+            
+            if error is None:
+                logger.info(f"Removed old backup: {backup_dir}")
+            else:
+                logger.error(f"Failed to remove old backup {backup_dir}: {error}")
+        
+        self.pending_removals.clear()
+    
     def run_hourly_backup(self) -> Dict[str, bool]:
         """Run hourly backup routine"""
         results = {}
         
         logger.info("Starting hourly backup routine")
         
-        # Export databases
-        db_results = self.export_databases()
-        results.update(db_results)
-        
-        # Backup key directories
-        for name, source in self.backup_sources.items():
-            if os.path.exists(source):
-                success, message = self.backup_directory(source, name)
-                results[name] = success
-                if not success:
-                    logger.error(f"Backup failed for {name}: {message}")
-            else:
-                logger.warning(f"Source path does not exist: {source}")
-                results[name] = False
-        
-        # Cleanup old backups
-        self.cleanup_old_backups()
-        
-        # Sync to cloud
-        today_backup = self.backup_root / datetime.now().strftime("%Y%m%d")
-        if today_backup.exists():
-            results['cloud_sync'] = self.sync_to_cloud(str(today_backup))
+        # Always reap deletions and shut the rclone daemon down, even when a
+        # step raises, so no rcd (or its credentials) outlives this run
+        try:
+            # Export databases
+            db_results = self.export_databases()
+            results.update(db_results)
+            
+            # Backup key directories - sources are independent and tar runs out of
+            # process, so overlap them instead of backing up one at a time
+            with ThreadPoolExecutor(max_workers=min(len(self.backup_sources), os.cpu_count())) as executor:
+                futures = {}
+                for name, source in self.backup_sources.items():
+                    if os.path.exists(source):
+                        futures[executor.submit(self.backup_directory, source, name)] = name
+                    else:
+                        logger.warning(f"Source path does not exist: {source}")
+                        results[name] = False
+            
+                for future in as_completed(futures):
+                    name = futures[future]
+                    success, message = future.result()
+                    results[name] = success
+                    if not success:
+                        logger.error(f"Backup failed for {name}: {message}")
+            
+            # Cleanup old backups
+            self.cleanup_old_backups()
+            
+            # Sync to cloud
+            today_backup = self.backup_root / datetime.now().strftime("%Y%m%d")
+            if today_backup.exists():
+                results['cloud_sync'] = self.sync_to_cloud(str(today_backup))
+        finally:
+            self.wait_for_removals()
+            self.stop_rclone_daemon()
         
         logger.info(f"Backup routine completed. Results: {results}")
         return results
@@ -3,8 +3,13 @@ Simple AITB ↔ GOmini-AI Handshake Test
 Tests the cross-agent communication without full Docker deployment
 """
 
+import asyncio
+import contextlib
+import io
+import aiohttp
 import requests
 import json
+import sys
 import time
 from datetime import datetime
 
@@ -70,15 +75,21 @@ def test_handshake_simulation():
         print()
         
         # Log to activity log
-        log_entry = f"Handshake {handshake_request['client_type']} ↔ GOmini-AI completed [{datetime.now().isoformat()}]; token established."
+        now = datetime.now()
+        log_entry = f"Handshake {handshake_request['client_type']} ↔ GOmini-AI completed [{now.isoformat()}]; token established."
+        
+        # Build the whole entry up front and append it in a single write
+        log_block = (
+            f"\n### {now.strftime('%H:%M:%S')} - Cross-Agent Handshake\n"
+            f"- **Event**: {log_entry}\n"
+            f"- **Client**: {handshake_request['client_id']}\n"
+            f"- **Permissions**: {len(handshake_request['requested_permissions'])} granted\n"
+            f"- **Status**: AUTHORIZED ✅\n\n"
+        )
         
         try:
-            with open('D:/GentleOmega/logs/activity_log.md', 'a') as f:
-                f.write(f"\n### {datetime.now().strftime('%H:%M:%S')} - Cross-Agent Handshake\n")
-                f.write(f"- **Event**: {log_entry}\n")
-                f.write(f"- **Client**: {handshake_request['client_id']}\n")
-                f.write(f"- **Permissions**: {len(handshake_request['requested_permissions'])} granted\n")
-                f.write(f"- **Status**: AUTHORIZED ✅\n\n")
+            with open('D:/GentleOmega/logs/activity_log.md', 'ab') as f:
+                f.write(log_block.encode('utf-8'))
             
             print("📝 Activity Log Updated")
             print()
@@ -104,6 +115,21 @@ def test_handshake_simulation():
         print("❌ Handshake DENIED by user")
         return False
 
+async def probe_endpoints(endpoints):
+    """Probe health endpoints concurrently over one pooled session"""
+    timeout = aiohttp.ClientTimeout(total=1)
+    connector = aiohttp.TCPConnector(limit=10)
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def probe(url):
+            try:
+                async with session.get(url) as response:
+                    return response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return None
+        
+        return await asyncio.gather(*(probe(url) for url in endpoints))
+
 def check_network_connectivity():
     """Check if networks can communicate"""
     print("🌐 Network Connectivity Check")
@@ -117,16 +143,21 @@ def check_network_connectivity():
         "http://192.168.1.100:8508/health"   # Mock GOmini-Gateway
     ]
     
-    for endpoint in test_endpoints:
+    statuses = asyncio.run(probe_endpoints(test_endpoints))
+    
+    for endpoint, status in zip(test_endpoints, statuses):
         service_name = endpoint.split(':')[2].split('/')[0]
-        print(f"   Port {service_name}: READY (simulated)")
+        if status == 200:
+            print(f"   Port {service_name}: READY")
+        else:
+            print(f"   Port {service_name}: READY (simulated)")
     
     print("   Network bridge: aitb_net ↔ gomini_net CONFIGURED")
     print("   Local LAN access: ENABLED")
     print()
 
-def main():
-    """Main test execution"""
+def run_handshake_test():
+    """Run the connectivity check and handshake simulation"""
     print("🚀 GentleΩ Phase 1 Handshake Test")
     print("=" * 60)
     print(f"Time: {datetime.now().isoformat()}")
@@ -161,5 +192,16 @@ def main():
     print("3. Verify real Windows credential storage")
     print("4. Validate AITB integration")
 
+def main():
+    """Main test execution"""
+    # Collect the report and emit it in a single write instead of per print()
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            run_handshake_test()
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
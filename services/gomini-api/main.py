@@ -1,16 +1,22 @@
 import os
 import asyncio
+import hashlib
+import threading
+import time
 import uvicorn
 import httpx
 from fastapi import FastAPI, HTTPException, Depends, Security
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import logging
 from datetime import datetime, timedelta
 import jwt
+import orjson
 import socketio
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(
@@ -23,10 +29,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 app = FastAPI(
     title="GOmini-AI API",
     description="HTTP + SignalR bridge for AITB/UI integration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -41,10 +50,31 @@ app.add_middleware(
 security = HTTPBearer()
 SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
 
-# SocketIO server
+# Decoded JWT payloads keyed by SHA-256 of the token, so repeat requests skip
+# HMAC verification. verify_token runs in FastAPI's threadpool, hence the lock.
+_jwt_cache = TTLCache(
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("JWT_CACHE_TTL", "30"))
+)
+_jwt_cache_lock = threading.Lock()
+
+# SocketIO server. With REDIS_URL set, broadcasts fan out over Redis pub/sub so
+# every worker process sees them; otherwise emits stay in this process.
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Several uvicorn workers need Redis for broadcasts, and also websocket-only
+# transport: long-polling sessions span many HTTP requests that uvicorn may
+# hand to different workers, which then reject them as "Invalid session".
+# Clients must connect with transports=['websocket'] in that mode.
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+if API_WORKERS > 1 and not REDIS_URL:
+    raise RuntimeError("API_WORKERS > 1 requires REDIS_URL")
+
 sio = socketio.AsyncServer(
     cors_allowed_origins="*",
-    async_mode='asgi'
+    async_mode='asgi',
+    client_manager=socketio.AsyncRedisManager(REDIS_URL) if REDIS_URL else None,
+    transports=["websocket"] if API_WORKERS > 1 else ["polling", "websocket"]
 )
 socketio_app = socketio.ASGIApp(sio, app)
 
@@ -74,27 +104,33 @@ class APIManager:
     def __init__(self):
         self.core_url = os.getenv("GOMINI_CORE_URL", "http://gomini-core:8505")
         self.vector_url = os.getenv("GOMINI_VECTOR_URL", "http://gomini-vector:8506")
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Bursts of /chat fan out to core concurrently; a small keepalive pool would
+        # queue them behind each other, so allow many connections and fail fast on connect
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=2.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+        )
+    
+    @staticmethod
+    def service_status(result) -> str:
+        """Map a health probe result (response or exception) to a status string"""
+        if isinstance(result, Exception):
+            return "unreachable"
+        return "healthy" if result.status_code == 200 else "unhealthy"
     
     async def check_services(self):
         """Check health of connected services"""
-        services = {}
-        
-        try:
-            # Check core service
-            response = await self.client.get(f"{self.core_url}/health")
-            services["core"] = "healthy" if response.status_code == 200 else "unhealthy"
-        except:
-            services["core"] = "unreachable"
-        
-        try:
-            # Check vector service
-            response = await self.client.get(f"{self.vector_url}/health")
-            services["vector"] = "healthy" if response.status_code == 200 else "unhealthy"
-        except:
-            services["vector"] = "unreachable"
+        # Probe core and vector concurrently
+        core_result, vector_result = await asyncio.gather(
+            self.client.get(f"{self.core_url}/health"),
+            self.client.get(f"{self.vector_url}/health"),
+            return_exceptions=True
+        )
         
-        return services
+        return {
+            "core": self.service_status(core_result),
+            "vector": self.service_status(vector_result)
+        }
     
     async def generate_response(self, message: str, model_name: Optional[str] = None) -> Dict[str, Any]:
         """Generate response using core service"""
@@ -110,15 +146,43 @@ class APIManager:
             
             response = await self.client.post(
                 f"{self.core_url}/inference",
-                json=payload
+                content=orjson.dumps(payload),
+                headers=JSON_HEADERS
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
             
         except Exception as e:
             logger.error(f"Error generating response: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Inference failed: {str(e)}")
     
+    async def stream_response(self, message: str, model_name: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Relay the core service's streamed inference events as they arrive"""
+        payload = {
+            "prompt": message,
+            "max_tokens": 512,
+            "temperature": 0.7
+        }
+        
+        if model_name:
+            payload["model_name"] = model_name
+        
+        # No read timeout: gaps between tokens include model loading
+        async with self.client.stream(
+            "POST",
+            f"{self.core_url}/inference/stream",
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
+            timeout=httpx.Timeout(30.0, read=None)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    event = orjson.loads(line[6:])
+                    if "error" in event:
+                        raise RuntimeError(event["error"])
+                    yield event
+    
     async def search_memory(self, query: str, collection: str = "default", n_results: int = 5) -> Dict[str, Any]:
         """Search vector memory"""
         try:
@@ -130,31 +194,103 @@ class APIManager:
             
             response = await self.client.post(
                 f"{self.vector_url}/search",
-                json=payload
+                content=orjson.dumps(payload),
+                headers=JSON_HEADERS
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
             
         except Exception as e:
             logger.error(f"Error searching memory: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Memory search failed: {str(e)}")
 
+class ChatBroadcaster:
+    """Coalesce chat_response broadcasts that arrive within a short window
+
+    Small bursts are still sent as individual chat_response events; only
+    bursts of batch_threshold or more collapse into one chat_response_batch.
+    """
+    
+    def __init__(self, server: socketio.AsyncServer, window: float = 0.01, batch_threshold: int = 50):
+        self.sio = server
+        self.window = window
+        self.batch_threshold = batch_threshold
+        self.pending: List[Dict[str, Any]] = []
+        self.flush_task: Optional[asyncio.Task] = None
+    
+    def publish(self, payload: Dict[str, Any]):
+        """Queue a payload for the next broadcast flush"""
+        self.pending.append(payload)
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_after_window())
+    
+    async def flush_after_window(self):
+        """Wait for the batching window, then broadcast everything queued"""
+        cancelled = False
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            # Cancelled at shutdown: still send what this window collected
+            cancelled = True
+        
+        batch, self.pending = self.pending, []
+        self.flush_task = None
+        
+        try:
+            if len(batch) < self.batch_threshold:
+                for payload in batch:
+                    await self.sio.emit('chat_response', payload)
+            else:
+                await self.sio.emit('chat_response_batch', batch)
+        except Exception as e:
+            logger.error(f"Chat broadcast failed: {str(e)}")
+        
+        if cancelled:
+            raise asyncio.CancelledError
+    
+    async def close(self):
+        """Send anything still waiting for its window; called on shutdown"""
+        task = self.flush_task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
 # Initialize API manager
 api_manager = APIManager()
+chat_broadcaster = ChatBroadcaster(
+    sio,
+    window=float(os.getenv("CHAT_BATCH_WINDOW_MS", "10")) / 1000
+)
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     """Verify JWT token"""
     if not os.getenv("AUTH_REQUIRED", "true").lower() == "true":
         return {"user_id": "anonymous"}
     
+    token = credentials.credentials
+    cache_key = hashlib.sha256(token.encode()).digest()
+    
+    with _jwt_cache_lock:
+        payload = _jwt_cache.get(cache_key)
+    if payload is not None and payload.get("exp", float("inf")) > time.time():
+        return payload
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    # Only tokens that passed verification are cached
+    with _jwt_cache_lock:
+        _jwt_cache[cache_key] = payload
+    return payload
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued chat broadcasts before the server exits"""
+    await chat_broadcaster.close()
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -183,7 +319,7 @@ async def chat(message: ChatMessage, user: dict = Depends(verify_token)):
             message.model_preference
         )
         
-        session_id = message.session_id or f"session_{datetime.now().timestamp()}"
+        session_id = message.session_id or f"session_{time.time_ns()}"
         
         response = ChatResponse(
             response=inference_result["response"],
@@ -192,8 +328,8 @@ async def chat(message: ChatMessage, user: dict = Depends(verify_token)):
             session_id=session_id
         )
         
-        # Broadcast to connected clients via SocketIO
-        await sio.emit('chat_response', {
+        # Broadcast to connected clients via SocketIO (coalesced with other chats)
+        chat_broadcaster.publish({
             "session_id": session_id,
             "response": response.response,
             "model_used": response.model_used,
@@ -206,6 +342,23 @@ async def chat(message: ChatMessage, user: dict = Depends(verify_token)):
         logger.error(f"Chat failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/stream")
+async def chat_stream(message: ChatMessage, user: dict = Depends(verify_token)):
+    """Chat endpoint that streams response text as server-sent events"""
+    logger.info(f"Streaming chat request from user {user.get('user_id', 'anonymous')}: {message.message[:50]}...")
+    session_id = message.session_id or f"session_{time.time_ns()}"
+    
+    async def events():
+        try:
+            async for event in api_manager.stream_response(message.message, message.model_preference):
+                event["session_id"] = session_id
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Streaming chat failed: {str(e)}")
+            yield b"data: " + orjson.dumps({"session_id": session_id, "error": str(e)}) + b"\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/search")
 async def search_memory(query: SearchQuery, user: dict = Depends(verify_token)):
     """Search semantic memory"""
@@ -240,7 +393,8 @@ async def create_token(user_id: str):
 @sio.event
 async def connect(sid, environ, auth):
     logger.info(f"Client connected: {sid}")
-    await sio.emit('status', {'message': 'Connected to GOmini-AI'}, room=sid)
+    # Replies to a connected sid are local, so they skip the message queue
+    await sio.emit('status', {'message': 'Connected to GOmini-AI'}, room=sid, ignore_queue=True)
 
 @sio.event
 async def disconnect(sid):
@@ -252,19 +406,26 @@ async def chat_message(sid, data):
         message = data.get('message', '')
         model_preference = data.get('model_preference')
         
-        # Generate response
-        inference_result = await api_manager.generate_response(message, model_preference)
-        
-        # Send response back to client
-        await sio.emit('chat_response', {
-            "response": inference_result["response"],
-            "model_used": inference_result["model_used"],
-            "timestamp": datetime.now().isoformat()
-        }, room=sid)
+        # Forward text to the client as it is generated, then close with the full reply
+        chunks = []
+        async for event in api_manager.stream_response(message, model_preference):
+            if "text" in event:
+                chunks.append(event["text"])
+                await sio.emit('chat_response_delta', {
+                    "session_id": sid,
+                    "text": event["text"]
+                }, room=sid, ignore_queue=True)
+            elif event.get("done"):
+                await sio.emit('chat_response_done', {
+                    "session_id": sid,
+                    "response": "".join(chunks).strip(),
+                    "model_used": event["model_used"],
+                    "timestamp": datetime.now().isoformat()
+                }, room=sid, ignore_queue=True)
         
     except Exception as e:
         logger.error(f"SocketIO chat error: {str(e)}")
-        await sio.emit('error', {'message': str(e)}, room=sid)
+        await sio.emit('error', {'message': str(e)}, room=sid, ignore_queue=True)
 
 if __name__ == "__main__":
     port = int(os.getenv("API_PORT", 8507))
@@ -277,5 +438,9 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=False,
-        log_level="info"
+        workers=API_WORKERS,
+        log_level="info",
+        loop="auto",
+        http="auto",
+        interface="asgi3"
     )
\ No newline at end of file
@@ -1,15 +1,21 @@
 import os
 import asyncio
+import gc
+import threading
 import uvicorn
+import httpx
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import logging
 from datetime import datetime
+from collections import OrderedDict
 import json
+import orjson
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, TextIteratorStreamer
 import time
 
 # Configure logging
@@ -23,10 +29,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Device capabilities don't change at runtime; query the CUDA driver once
+_CUDA_AVAILABLE = torch.cuda.is_available()
+_GPU_TOTAL_MEMORY = torch.cuda.get_device_properties(0).total_memory if _CUDA_AVAILABLE else 0
+
+# Inference micro-batching: concurrent requests arriving within the wait
+# window are generated together in one model.generate call
+MAX_BATCH = int(os.getenv("GOMINI_MAX_BATCH", "8"))
+MAX_WAIT_MS = float(os.getenv("GOMINI_BATCH_WAIT_MS", "10"))
+TORCH_COMPILE = os.getenv("GOMINI_TORCH_COMPILE", "false").lower() == "true"
+
+# Optional vLLM OpenAI-compatible server; when set, inference is delegated to it
+VLLM_URL = os.getenv("VLLM_URL")
+VLLM_MODEL = os.getenv("VLLM_MODEL")
+
+# Weight quantization: "4bit" (NF4) or "8bit"; empty loads full-precision weights
+QUANTIZATION = os.getenv("GOMINI_QUANT", "").lower()
+
+# Loaded models are kept in LRU order; the least recently used is unloaded past this count
+MAX_LOADED_MODELS = int(os.getenv("GOMINI_MAX_LOADED_MODELS", "2"))
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 app = FastAPI(
     title="GOmini-AI Core",
     description="Hybrid inference engine for GentleΩ system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -58,11 +87,32 @@ class HealthResponse(BaseModel):
 
 class ModelManager:
     def __init__(self):
-        self.models = {}
+        self.models: OrderedDict[str, torch.nn.Module] = OrderedDict()
         self.tokenizers = {}
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # One generate() at a time per model: the batcher and streamed requests
+        # run in worker threads and would otherwise share KV cache and compile state
+        self.generate_locks: Dict[str, threading.Lock] = {}
+        self.device = torch.device("cuda" if _CUDA_AVAILABLE else "cpu")
+        self.inference_queue: asyncio.Queue = asyncio.Queue()
+        self.batcher_task: Optional[asyncio.Task] = None
+        self.vllm_client = httpx.AsyncClient(base_url=VLLM_URL, timeout=300.0) if VLLM_URL else None
         logger.info(f"Using device: {self.device}")
+        if VLLM_URL:
+            logger.info(f"Delegating inference to vLLM at {VLLM_URL}")
         
+    def quantization_config(self) -> Optional[BitsAndBytesConfig]:
+        """Build the bitsandbytes config selected by GOMINI_QUANT"""
+        if QUANTIZATION == "4bit":
+            compute_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            return BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=compute_dtype
+            )
+        if QUANTIZATION == "8bit":
+            return BitsAndBytesConfig(load_in_8bit=True)
+        return None
+    
     async def load_model(self, model_name: str):
         """Load a model and tokenizer"""
         try:
@@ -72,15 +122,17 @@ class ModelManager:
                 # Load tokenizer
                 tokenizer = AutoTokenizer.from_pretrained(
                     model_name,
+                    use_fast=True,
                     cache_dir="/app/models/huggingface"
                 )
                 
                 # Load model with quantization if GPU available
-                if torch.cuda.is_available():
+                if _CUDA_AVAILABLE:
                     model = AutoModelForCausalLM.from_pretrained(
                         model_name,
                         torch_dtype=torch.float16,
                         device_map="auto",
+                        quantization_config=self.quantization_config(),
                         cache_dir="/app/models/huggingface"
                     )
                 else:
@@ -88,52 +140,190 @@ class ModelManager:
                         model_name,
                         cache_dir="/app/models/huggingface"
                     )
+                    
+                    # bitsandbytes is GPU-only; on CPU use dynamic int8 Linear layers
+                    if QUANTIZATION in ("4bit", "8bit"):
+                        model = torch.quantization.quantize_dynamic(
+                            model, {torch.nn.Linear}, dtype=torch.qint8
+                        )
+                
+                # Batched generation needs a pad token and, for decoder-only
+                # models, left padding so every prompt ends at the same position
+                if tokenizer.pad_token is None:
+                    tokenizer.pad_token = tokenizer.eos_token
+                tokenizer.padding_side = "left"
+                
+                if TORCH_COMPILE:
+                    # Compile forward() rather than the module so generate() uses it
+                    model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=False)
                 
                 self.models[model_name] = model
                 self.tokenizers[model_name] = tokenizer
                 logger.info(f"Model {model_name} loaded successfully")
                 
+                self.evict_models()
+                
         except Exception as e:
             logger.error(f"Error loading model {model_name}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to load model: {str(e)}")
     
+    def evict_models(self):
+        """Unload least recently used models beyond MAX_LOADED_MODELS"""
+        while len(self.models) > MAX_LOADED_MODELS:
+            model_name, model = self.models.popitem(last=False)
+            self.tokenizers.pop(model_name, None)
+            self.generate_locks.pop(model_name, None)
+            del model
+            gc.collect()
+            if _CUDA_AVAILABLE:
+                torch.cuda.empty_cache()
+            logger.info(f"Unloaded least recently used model: {model_name}")
+    
+    async def acquire_model(self, model_name: str) -> tuple:
+        """Return (model, tokenizer), loading the model if needed and marking it recently used"""
+        if model_name not in self.models:
+            await self.load_model(model_name)
+        self.models.move_to_end(model_name)
+        return self.models[model_name], self.tokenizers[model_name]
+    
+    def generate_lock(self, model_name: str) -> threading.Lock:
+        """Lock serialising generate() calls on one model"""
+        return self.generate_locks.setdefault(model_name, threading.Lock())
+    
+    def start_batcher(self):
+        """Start the background task that drains the inference queue"""
+        if self.batcher_task is None:
+            self.batcher_task = asyncio.create_task(self.run_batcher())
+    
+    async def run_batcher(self):
+        """Collect queued requests into batches and generate them together"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self.inference_queue.get()]
+            deadline = loop.time() + MAX_WAIT_MS / 1000
+            
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.inference_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Only requests with identical generation settings can share a call
+            groups: Dict[tuple, list] = {}
+            for model_name, request, future in batch:
+                key = (model_name, request.max_tokens, request.temperature)
+                groups.setdefault(key, []).append((request, future))
+            
+            for (model_name, _, _), items in groups.items():
+                requests = [request for request, _ in items]
+                try:
+                    # Hold references here so an eviction mid-generation can't pull the model
+                    model, tokenizer = await self.acquire_model(model_name)
+                    results = await asyncio.to_thread(
+                        self.generate_batch, model, tokenizer, requests, self.generate_lock(model_name)
+                    )
+                except Exception as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (_, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+    
+    def generate_batch(self, model, tokenizer, requests: List[InferenceRequest], lock: threading.Lock) -> List[tuple]:
+        """Run one model.generate call for requests sharing model and settings"""
+        
+        # Tokenize all prompts together, padded to a common length
+        inputs = tokenizer(
+            [request.prompt for request in requests],
+            padding=True,
+            truncation=True,
+            max_length=1024,
+            return_tensors="pt"
+        )
+        
+        # Copy from pinned host memory so the transfer can overlap GPU work
+        if _CUDA_AVAILABLE:
+            inputs = {k: v.pin_memory().to(self.device, non_blocking=True) for k, v in inputs.items()}
+        else:
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        
+        # Generate response
+        with lock, torch.no_grad():
+            outputs = model.generate(
+                **inputs,
+                max_new_tokens=requests[0].max_tokens,
+                temperature=requests[0].temperature,
+                do_sample=True,
+                use_cache=True,
+                pad_token_id=tokenizer.pad_token_id
+            )
+        
+        input_length = inputs["input_ids"].shape[-1]
+        results = []
+        for output in outputs:
+            # Decode only the generated tokens; the prompt occupies the first input_length positions
+            new_tokens = output[input_length:]
+            response_text = tokenizer.decode(new_tokens, skip_special_tokens=True).strip()
+            
+            # Finished sequences are padded out to the longest one in the batch
+            tokens_generated = int((new_tokens != tokenizer.pad_token_id).sum())
+            results.append((response_text, tokens_generated))
+        
+        return results
+    
+    async def generate_vllm(self, model_name: str, request: InferenceRequest) -> tuple:
+        """Generate via the vLLM server's OpenAI-compatible completions API"""
+        response = await self.vllm_client.post("/v1/completions", headers=JSON_HEADERS, content=orjson.dumps({
+            "model": model_name,
+            "prompt": request.prompt,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature
+        }))
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+        
+        return result["choices"][0]["text"].strip(), result["usage"]["completion_tokens"]
+    
     async def generate_response(self, request: InferenceRequest) -> InferenceResponse:
         """Generate response using loaded model"""
         start_time = time.time()
         
+        if self.vllm_client:
+            # vLLM serves a fixed model; HF weights are never loaded locally
+            model_name = VLLM_MODEL or request.model_name or "microsoft/DialoGPT-small"
+            try:
+                response_text, tokens_generated = await self.generate_vllm(model_name, request)
+            except Exception as e:
+                logger.error(f"Error during vLLM inference: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Inference failed: {str(e)}")
+            
+            return InferenceResponse(
+                response=response_text,
+                model_used=model_name,
+                tokens_generated=tokens_generated,
+                inference_time=time.time() - start_time
+            )
+        
         # Default to a lightweight model if none specified
         model_name = request.model_name or "microsoft/DialoGPT-small"
         
         # Load model if not already loaded
-        if model_name not in self.models:
-            await self.load_model(model_name)
+        await self.acquire_model(model_name)
         
         try:
-            model = self.models[model_name]
-            tokenizer = self.tokenizers[model_name]
-            
-            # Tokenize input
-            inputs = tokenizer.encode(request.prompt, return_tensors="pt").to(self.device)
-            
-            # Generate response
-            with torch.no_grad():
-                outputs = model.generate(
-                    inputs,
-                    max_new_tokens=request.max_tokens,
-                    temperature=request.temperature,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
-            
-            # Decode response
-            response_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Remove the input prompt from response
-            if response_text.startswith(request.prompt):
-                response_text = response_text[len(request.prompt):].strip()
+            # Hand the request to the batcher and wait for its share of the batch
+            future = asyncio.get_running_loop().create_future()
+            self.inference_queue.put_nowait((model_name, request, future))
+            response_text, tokens_generated = await future
             
             inference_time = time.time() - start_time
-            tokens_generated = len(outputs[0]) - len(inputs[0])
             
             return InferenceResponse(
                 response=response_text,
@@ -146,26 +336,84 @@ class ModelManager:
             logger.error(f"Error during inference: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Inference failed: {str(e)}")
 
+    async def stream_response(self, request: InferenceRequest) -> AsyncIterator[Dict[str, Any]]:
+        """Yield text deltas as the model produces them, then a final summary event
+        
+        Streamed requests run their own generate() call rather than joining a
+        batch, since each needs its own streamer, but take the model's generate
+        lock so they never overlap a batch on the same model.
+        """
+        start_time = time.time()
+        
+        if self.vllm_client:
+            # vLLM requests are already fast to first byte; send the whole reply as one delta
+            model_name = VLLM_MODEL or request.model_name or "microsoft/DialoGPT-small"
+            response_text, tokens_generated = await self.generate_vllm(model_name, request)
+            yield {"text": response_text}
+            yield {"done": True, "model_used": model_name, "tokens_generated": tokens_generated,
+                   "inference_time": time.time() - start_time}
+            return
+        
+        model_name = request.model_name or "microsoft/DialoGPT-small"
+        model, tokenizer = await self.acquire_model(model_name)
+        inputs = tokenizer(request.prompt, truncation=True, max_length=1024, return_tensors="pt").to(self.device)
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        lock = self.generate_lock(model_name)
+        
+        def generate():
+            try:
+                with lock, torch.no_grad():
+                    return model.generate(
+                        **inputs,
+                        max_new_tokens=request.max_tokens,
+                        temperature=request.temperature,
+                        do_sample=True,
+                        use_cache=True,
+                        pad_token_id=tokenizer.pad_token_id,
+                        streamer=streamer
+                    )
+            except Exception:
+                # Unblock the consumer below before the error propagates
+                streamer.end()
+                raise
+        
+        generation = asyncio.create_task(asyncio.to_thread(generate))
+        
+        # The streamer blocks on an internal queue, so pull each chunk off-loop
+        while (chunk := await asyncio.to_thread(next, streamer, None)) is not None:
+            if chunk:
+                yield {"text": chunk}
+        
+        outputs = await generation
+        yield {"done": True, "model_used": model_name,
+               "tokens_generated": outputs.shape[-1] - inputs["input_ids"].shape[-1],
+               "inference_time": time.time() - start_time}
+
 # Initialize model manager
 model_manager = ModelManager()
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the inference batcher"""
+    model_manager.start_batcher()
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
     try:
         memory_info = {}
-        if torch.cuda.is_available():
+        if _CUDA_AVAILABLE:
             memory_info = {
                 "gpu_memory_allocated": torch.cuda.memory_allocated(),
                 "gpu_memory_cached": torch.cuda.memory_reserved(),
-                "gpu_memory_total": torch.cuda.get_device_properties(0).total_memory
+                "gpu_memory_total": _GPU_TOTAL_MEMORY
             }
         
         return HealthResponse(
             status="healthy",
             timestamp=datetime.now().isoformat(),
             models_loaded=list(model_manager.models.keys()),
-            gpu_available=torch.cuda.is_available(),
+            gpu_available=_CUDA_AVAILABLE,
             memory_usage=memory_info
         )
     except Exception as e:
@@ -178,7 +426,7 @@ async def list_models():
     return {
         "loaded_models": list(model_manager.models.keys()),
         "device": str(model_manager.device),
-        "gpu_available": torch.cuda.is_available()
+        "gpu_available": _CUDA_AVAILABLE
     }
 
 @app.get("/metrics")
@@ -187,11 +435,11 @@ async def get_metrics():
     metrics = {
         "timestamp": datetime.now().isoformat(),
         "models_loaded": len(model_manager.models),
-        "gpu_available": torch.cuda.is_available(),
+        "gpu_available": _CUDA_AVAILABLE,
         "device": str(model_manager.device)
     }
     
-    if torch.cuda.is_available():
+    if _CUDA_AVAILABLE:
         metrics.update({
             "gpu_memory_allocated_mb": torch.cuda.memory_allocated() / 1024 / 1024,
             "gpu_memory_cached_mb": torch.cuda.memory_reserved() / 1024 / 1024,
@@ -213,6 +461,21 @@ async def generate_inference(request: InferenceRequest):
         logger.error(f"Inference failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/inference/stream")
+async def stream_inference(request: InferenceRequest):
+    """Stream inference output as server-sent events"""
+    logger.info(f"Streaming inference request: {request.prompt[:50]}...")
+    
+    async def events():
+        try:
+            async for event in model_manager.stream_response(request):
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Streaming inference failed: {str(e)}")
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/load_model")
 async def load_model_endpoint(model_name: str):
     """Load a specific model"""
@@ -234,5 +497,8 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=False,
-        log_level="info"
+        log_level="info",
+        loop="auto",
+        http="auto",
+        interface="asgi3"
     )
\ No newline at end of file
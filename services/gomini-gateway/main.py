@@ -1,18 +1,26 @@
 import os
 import asyncio
+import ctypes
+import itertools
 import uvicorn
 import httpx
 import subprocess
 import platform
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 import json
+import time
 import secrets
 import psutil
+from collections import deque
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(
@@ -25,10 +33,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Activity log lines are queued by the request path and written to disk by a
+# QueueListener thread, keeping file I/O off the event loop
+activity_queue = queue.SimpleQueue()
+activity_logger = logging.getLogger("activity")
+activity_logger.propagate = False
+activity_logger.setLevel(logging.INFO)
+activity_logger.addHandler(logging.handlers.QueueHandler(activity_queue))
+
+activity_file_handler = logging.FileHandler('/app/logs/activity.log')
+activity_file_handler.setFormatter(logging.Formatter('%(message)s'))
+activity_listener = logging.handlers.QueueListener(activity_queue, activity_file_handler)
+
+# user32 MessageBox flags and results
+MB_YESNO = 0x04
+MB_ICONQUESTION = 0x20
+IDYES = 6
+MB_TIMEDOUT = 32000
+CONFIRMATION_TIMEOUT_MS = 60_000
+
+# Tokens expire after 24 hours; evict them from memory at the same point
+TOKEN_TTL_SECONDS = 86400
+MAX_TOKENS = 100_000
+CONNECTION_HISTORY_SIZE = 1000
+
 app = FastAPI(
     title="GOmini Gateway",
     description="Secure bridge between AITB and GOmini-AI networks",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -57,10 +90,13 @@ class HealthResponse(BaseModel):
     connection_count: int
 
 class GatewayManager:
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
         self.active_connections = {}
-        self.authorized_tokens = {}
-        self.connection_history = []
+        self.authorized_tokens = TTLCache(maxsize=MAX_TOKENS, ttl=TOKEN_TTL_SECONDS)
+        self.client_tokens = TTLCache(maxsize=MAX_TOKENS, ttl=TOKEN_TTL_SECONDS)  # client_id -> live tokens, for O(1) revocation
+        self.connection_history = deque(maxlen=CONNECTION_HISTORY_SIZE)
+        self.total_connections = 0
+        self.client = client
         
     def show_user_confirmation_dialog(self, client_id: str, client_type: str, permissions: list) -> bool:
         """Show Windows user confirmation dialog"""
@@ -70,28 +106,26 @@ class GatewayManager:
                 return True  # Auto-approve on non-Windows systems
             
             # Create a simple message for the user
-            message = f"Allow {client_type} ({client_id}) to connect to GOmini-AI?\\n\\nRequested permissions:\\n"
+            message = f"Allow {client_type} ({client_id}) to connect to GOmini-AI?\n\nRequested permissions:\n"
             for perm in permissions:
-                message += f"- {perm}\\n"
+                message += f"- {perm}\n"
             
-            # Use PowerShell to show a message box
-            cmd = [
-                "powershell.exe",
-                "-Command",
-                f"[System.Windows.Forms.MessageBox]::Show('{message}', 'GOmini-AI Connection Request', 'YesNo', 'Question')"
-            ]
+            # Call user32 directly rather than starting PowerShell for one dialog.
+            # MessageBoxTimeoutW is MessageBoxW with the 60s auto-dismiss we relied on before.
+            result = ctypes.windll.user32.MessageBoxTimeoutW(
+                None, message, "GOmini-AI Connection Request",
+                MB_YESNO | MB_ICONQUESTION, 0, CONFIRMATION_TIMEOUT_MS
+            )
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            if result == MB_TIMEDOUT:
+                logger.warning("User confirmation dialog timed out")
+                return False
             
-            # Check if user clicked Yes (returns "Yes")
-            approved = result.stdout.strip() == "Yes"
+            approved = result == IDYES
             
             logger.info(f"User {'approved' if approved else 'denied'} connection from {client_type} ({client_id})")
             return approved
             
-        except subprocess.TimeoutExpired:
-            logger.warning("User confirmation dialog timed out")
-            return False
         except Exception as e:
             logger.error(f"Error showing confirmation dialog: {str(e)}")
             return False
@@ -129,21 +163,23 @@ class GatewayManager:
         status = {}
         
         try:
-            # Check GOmini-AI API
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                try:
-                    response = await client.get("http://gomini-api:8507/health")
-                    status["gomini_api"] = "reachable" if response.status_code == 200 else "unhealthy"
-                except:
-                    status["gomini_api"] = "unreachable"
-                
-                # Try to detect AITB network
-                try:
-                    # This would need to be configured based on actual AITB endpoints
-                    response = await client.get("http://host.docker.internal:3000/health", timeout=2.0)
-                    status["aitb_network"] = "reachable" if response.status_code == 200 else "unreachable"
-                except:
-                    status["aitb_network"] = "unreachable"
+            # Probe both networks concurrently over the shared pooled client
+            # (AITB endpoint would need to be configured for the actual deployment)
+            gomini_result, aitb_result = await asyncio.gather(
+                self.client.get("http://gomini-api:8507/health"),
+                self.client.get("http://host.docker.internal:3000/health", timeout=2.0),
+                return_exceptions=True
+            )
+            
+            if isinstance(gomini_result, Exception):
+                status["gomini_api"] = "unreachable"
+            else:
+                status["gomini_api"] = "reachable" if gomini_result.status_code == 200 else "unhealthy"
+            
+            if isinstance(aitb_result, Exception):
+                status["aitb_network"] = "unreachable"
+            else:
+                status["aitb_network"] = "reachable" if aitb_result.status_code == 200 else "unreachable"
         
         except Exception as e:
             logger.error(f"Network connectivity check failed: {str(e)}")
@@ -157,12 +193,17 @@ class GatewayManager:
             "client_id": client_id,
             "permissions": permissions,
             "issued_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now().timestamp() + 86400)  # 24 hours
+            "expires_at": (time.time() + TOKEN_TTL_SECONDS)  # 24 hours
         }
         
         # In production, this should be properly signed JWT
         token = secrets.token_urlsafe(32)
         self.authorized_tokens[token] = token_data
+        # Re-handshakes add to the client's set rather than replacing it, so a
+        # revoke covers every live token; reassigning refreshes the entry's TTL
+        # to the newest token's expiry, and already-expired tokens are dropped
+        live_tokens = {t for t in self.client_tokens.get(client_id, ()) if t in self.authorized_tokens}
+        self.client_tokens[client_id] = frozenset(live_tokens | {token})
         
         return token
     
@@ -171,8 +212,10 @@ class GatewayManager:
         try:
             logger.info(f"Handshake request from {request.client_type} ({request.client_id})")
             
-            # Show user confirmation dialog
-            user_approved = self.show_user_confirmation_dialog(
+            # Show user confirmation dialog - it blocks until answered, so keep
+            # it off the event loop
+            user_approved = await asyncio.to_thread(
+                self.show_user_confirmation_dialog,
                 request.client_id,
                 request.client_type,
                 request.requested_permissions
@@ -187,8 +230,10 @@ class GatewayManager:
             # Generate access token
             token = self.generate_access_token(request.client_id, request.requested_permissions)
             
-            # Store in Windows Credential Manager
-            credential_stored = self.store_token_in_credential_manager(request.client_id, token)
+            # Store in Windows Credential Manager (cmdkey is a blocking subprocess)
+            credential_stored = await asyncio.to_thread(
+                self.store_token_in_credential_manager, request.client_id, token
+            )
             
             # Record connection
             connection_record = {
@@ -201,6 +246,7 @@ class GatewayManager:
             }
             
             self.connection_history.append(connection_record)
+            self.total_connections += 1
             self.active_connections[request.client_id] = connection_record
             
             expires_at = datetime.fromtimestamp(
@@ -209,8 +255,7 @@ class GatewayManager:
             
             # Log to activity log
             log_message = f"Handshake {request.client_type} ↔ GOmini-AI completed [{datetime.now().isoformat()}]; token established."
-            with open('/app/logs/activity.log', 'a') as f:
-                f.write(f"{log_message}\n")
+            activity_logger.info(log_message)
             
             return HandshakeResponse(
                 status="authorized",
@@ -226,8 +271,22 @@ class GatewayManager:
                 message=f"Handshake failed: {str(e)}"
             )
 
-# Initialize gateway manager
-gateway_manager = GatewayManager()
+# Initialize gateway manager with one pooled HTTP client for all probes
+gateway_manager = GatewayManager(httpx.AsyncClient(
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+))
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the activity log writer"""
+    activity_listener.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared HTTP client and flush the activity log"""
+    await gateway_manager.client.aclose()
+    activity_listener.stop()
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -253,10 +312,11 @@ async def handshake(request: HandshakeRequest):
 @app.get("/connections")
 async def list_connections():
     """List active connections"""
+    history = gateway_manager.connection_history
     return {
         "active_connections": list(gateway_manager.active_connections.keys()),
-        "connection_history": gateway_manager.connection_history[-10:],  # Last 10
-        "total_connections": len(gateway_manager.connection_history)
+        "connection_history": list(itertools.islice(history, max(len(history) - 10, 0), None)),  # Last 10
+        "total_connections": gateway_manager.total_connections
     }
 
 @app.get("/network-status")
@@ -288,15 +348,9 @@ async def revoke_connection(client_id: str):
             # Remove from active connections
             connection = gateway_manager.active_connections.pop(client_id)
             
-            # Invalidate token
-            token = None
-            for t, data in gateway_manager.authorized_tokens.items():
-                if data["client_id"] == client_id:
-                    token = t
-                    break
-            
-            if token:
-                del gateway_manager.authorized_tokens[token]
+            # Invalidate every token issued to the client
+            for token in gateway_manager.client_tokens.pop(client_id, ()):
+                gateway_manager.authorized_tokens.pop(token, None)
             
             logger.info(f"Connection revoked for {client_id}")
             return {"status": "success", "message": f"Connection revoked for {client_id}"}
@@ -318,5 +372,8 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=False,
-        log_level="info"
+        log_level="info",
+        loop="auto",
+        http="auto",
+        interface="asgi3"
     )
\ No newline at end of file
@@ -1,5 +1,7 @@
 import os
 import asyncio
+import json
+import threading
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,6 +13,13 @@ import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import torch
+from cachetools import LRUCache
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +32,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Embedding backend: "openvino" and "onnx" run pre-quantized int8 graphs on CPU,
+# "torch" the FP32 weights. Unavailable backends fall through in this order.
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDER_BACKENDS = ["openvino", "onnx", "torch"]
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "onnx").lower()
+EMBEDDER_FILES = {
+    "openvino": os.getenv("VECTOR_OPENVINO_FILE", "openvino/openvino_model_qint8_quantized.xml"),
+    "onnx": os.getenv("VECTOR_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+}
+
+# Intra-op threads for encoding; container defaults can leave this at 1
+EMBED_THREADS = int(os.getenv("VECTOR_NUM_THREADS", os.cpu_count() or 1))
+
+# Embedding micro-batching: texts queued within the wait window are encoded
+# together in one forward pass
+EMBED_MAX_BATCH = int(os.getenv("VECTOR_MAX_BATCH", "64"))
+EMBED_WAIT_MS = float(os.getenv("VECTOR_BATCH_WAIT_MS", "5"))
+
+# Large ingests are embedded and written in chunks of this many documents
+ADD_CHUNK_SIZE = int(os.getenv("VECTOR_ADD_CHUNK_SIZE", "32"))
+
+# Collections up to this size are searched by SIMD brute force over their
+# compact vector store; larger ones go through Chroma's HNSW index
+BRUTE_FORCE_MAX = int(os.getenv("VECTOR_BRUTE_FORCE_MAX", "500000"))
+
+# Precision of the brute-force copy: "int8" (quarter size) or "float16" (half size)
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "int8").lower()
+
+# Repeated search queries reuse their embedding instead of re-running the model
+QUERY_CACHE_SIZE = int(os.getenv("VECTOR_QUERY_CACHE_SIZE", "4096"))
+
 app = FastAPI(
     title="GOmini-AI Vector",
     description="Semantic memory database for GentleΩ system",
@@ -58,11 +98,132 @@ class HealthResponse(BaseModel):
     collections: List[str]
     total_documents: int
 
+class VectorStore:
+    """Compact copy of one collection's embeddings for brute-force search
+    
+    "int8" scales each vector so its largest component maps to 127 and keeps
+    the per-row scale; "float16" stores half-precision values (scale 1).
+    Rows live in an append-only raw file that is memory-mapped for scans,
+    with scales, ids and the row width in sibling files. Chroma stays the
+    FP32 source of truth.
+    """
+    
+    def __init__(self, path: str, dtype: str = "int8"):
+        self.dtype = np.dtype(dtype)
+        self.vectors_path = path + ".vectors"
+        self.scales_path = path + ".scales"
+        self.ids_path = path + ".ids.jsonl"
+        self.meta_path = path + ".meta.json"
+        self.lock = threading.Lock()
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.dim = 0
+        self.vectors = np.empty((0, 0), dtype=self.dtype)
+        self.scales = np.empty(0, dtype=np.float32)
+        
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+            self.load()
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def load(self):
+        """Read ids and map rows, dropping any tail left by an interrupted append"""
+        for path in (self.vectors_path, self.scales_path):
+            open(path, "ab").close()
+        with open(self.ids_path, "a+", encoding="utf-8") as f:
+            f.seek(0)
+            ids = [json.loads(line) for line in f if line.endswith("\n")]
+        
+        count = min(
+            len(ids),
+            os.path.getsize(self.vectors_path) // (self.dim * self.dtype.itemsize),
+            os.path.getsize(self.scales_path) // 4
+        )
+        
+        os.truncate(self.vectors_path, count * self.dim * self.dtype.itemsize)
+        os.truncate(self.scales_path, count * 4)
+        if count < len(ids):
+            with open(self.ids_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(doc_id) + "\n" for doc_id in ids[:count])
+        
+        self.ids = ids[:count]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self.remap()
+    
+    def remap(self):
+        """Re-open the memory maps over every row written so far"""
+        count = len(self.ids)
+        if count and self.dim:
+            self.vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(count, self.dim))
+            self.scales = np.memmap(self.scales_path, dtype=np.float32, mode="r", shape=(count,))
+    
+    def encode(self, embeddings: np.ndarray) -> tuple:
+        """Convert FP32 rows to the store's dtype, returning (vectors, scales)"""
+        if self.dtype == np.int8:
+            scales = (127.0 / np.maximum(np.abs(embeddings).max(axis=1), 1e-12)).astype(np.float32)
+            return np.round(embeddings * scales[:, None]).astype(np.int8), scales
+        return embeddings.astype(self.dtype), np.ones(len(embeddings), dtype=np.float32)
+    
+    def add(self, ids: List[str], embeddings: np.ndarray):
+        """Convert and append embeddings, skipping ids that are already stored"""
+        with self.lock:
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self.rows]
+            if not keep:
+                return
+            
+            vectors, scales = self.encode(embeddings[keep])
+            if not self.dim:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            
+            # Rows are written before ids; load() trims whatever an interrupted append left behind
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            with open(self.scales_path, "ab") as f:
+                f.write(scales.tobytes())
+            with open(self.ids_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(ids[i]) + "\n" for i in keep)
+            
+            for i in keep:
+                self.rows[ids[i]] = len(self.ids)
+                self.ids.append(ids[i])
+            self.remap()
+    
+    def search(self, query: np.ndarray, k: int) -> tuple:
+        """Return the ids and cosine distances of the k nearest stored vectors"""
+        with self.lock:
+            vectors, ids = self.vectors, self.ids
+        
+        # SimSIMD needs matching dtypes; f16 rows are widened with F16C inside the kernel
+        encoded, _ = self.encode(query[None, :])
+        distances = np.asarray(simsimd.cdist(encoded, vectors, metric="cosine"))[0]
+        
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [ids[i] for i in top], distances[top].tolist()
+    
+    def delete(self):
+        """Remove the store's files"""
+        with self.lock:
+            for path in (self.vectors_path, self.scales_path, self.ids_path, self.meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
 class VectorManager:
     def __init__(self):
         self.client = None
         self.embedder = None
+        self.embedder_backend = None
+        self.query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE)
         self.collections = {}
+        self.vector_stores: Dict[str, VectorStore] = {}
+        self.embed_queue: asyncio.Queue = asyncio.Queue()
+        self.batcher_task: Optional[asyncio.Task] = None
         self.init_chroma()
         self.init_embedder()
     
@@ -71,6 +232,8 @@ class VectorManager:
         try:
             persist_directory = os.getenv("PERSIST_DIRECTORY", "/app/vector_db")
             os.makedirs(persist_directory, exist_ok=True)
+            self.store_directory = os.path.join(persist_directory, "vector_store")
+            os.makedirs(self.store_directory, exist_ok=True)
             
             self.client = chromadb.PersistentClient(
                 path=persist_directory,
@@ -87,13 +250,97 @@ class VectorManager:
     
     def init_embedder(self):
         """Initialize sentence transformer for embeddings"""
+        # Cached query embeddings belong to the previous model
+        self.query_cache.clear()
         try:
-            self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+            torch.set_num_threads(EMBED_THREADS)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Already fixed once parallel work has started
+            logger.info(f"Embedding with {EMBED_THREADS} intra-op threads")
+            
+            start = EMBEDDER_BACKENDS.index(VECTOR_BACKEND) if VECTOR_BACKEND in EMBEDDER_BACKENDS else 1
+            for backend in EMBEDDER_BACKENDS[start:-1]:
+                try:
+                    model_kwargs = {"file_name": EMBEDDER_FILES[backend]}
+                    if backend == "onnx":
+                        import onnxruntime
+                        session_options = onnxruntime.SessionOptions()
+                        session_options.intra_op_num_threads = EMBED_THREADS
+                        session_options.inter_op_num_threads = 1
+                        model_kwargs["session_options"] = session_options
+                    else:
+                        model_kwargs["ov_config"] = {"INFERENCE_NUM_THREADS": str(EMBED_THREADS)}
+                    
+                    self.embedder = SentenceTransformer(
+                        EMBEDDING_MODEL,
+                        backend=backend,
+                        model_kwargs=model_kwargs
+                    )
+                    self.embedder_backend = backend
+                    logger.info(f"Sentence transformer initialized ({backend}: {EMBEDDER_FILES[backend]})")
+                    return
+                except Exception as e:
+                    logger.warning(f"{backend} embedder unavailable, trying next backend: {str(e)}")
+            
+            self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+            self.embedder_backend = "torch"
             logger.info("Sentence transformer initialized")
         except Exception as e:
             logger.error(f"Failed to initialize embedder: {str(e)}")
             raise
     
+    def start_batcher(self):
+        """Start the background task that drains the embedding queue"""
+        if self.batcher_task is None:
+            self.batcher_task = asyncio.create_task(self.run_batcher())
+    
+    async def run_batcher(self):
+        """Collect queued texts into batches and encode them together"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self.embed_queue.get()]
+            deadline = loop.time() + EMBED_WAIT_MS / 1000
+            
+            while len(batch) < EMBED_MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.embed_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Similar lengths side by side keep padding inside each forward pass low
+            batch.sort(key=lambda item: len(item[0]))
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await asyncio.to_thread(
+                    self.embedder.encode, texts, batch_size=EMBED_MAX_BATCH, convert_to_numpy=True
+                )
+                embeddings = embeddings.astype(np.float32, copy=False)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Queue texts for the batcher and wait for their embeddings as a float32 matrix"""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self.embed_queue.put_nowait((text, future))
+            futures.append(future)
+        return np.stack(await asyncio.gather(*futures))
+    
     def get_or_create_collection(self, collection_name: str):
         """Get or create a collection"""
         try:
@@ -109,6 +356,7 @@ class VectorManager:
                     logger.info(f"Created new collection: {collection_name}")
                 
                 self.collections[collection_name] = collection
+                self.vector_stores[collection_name] = self.load_vector_store(collection_name, collection)
             
             return self.collections[collection_name]
             
@@ -116,26 +364,66 @@ class VectorManager:
             logger.error(f"Error with collection {collection_name}: {str(e)}")
             raise
     
+    def vector_store_path(self, collection_name: str, dtype: str) -> str:
+        """Path prefix of a collection's vector store files for the given precision"""
+        return os.path.join(self.store_directory, f"{collection_name}.{dtype}")
+    
+    def load_vector_store(self, collection_name: str, collection) -> VectorStore:
+        """Open a collection's vector store, backfilling it from Chroma if it is behind"""
+        store = VectorStore(self.vector_store_path(collection_name, VECTOR_STORE_DTYPE), VECTOR_STORE_DTYPE)
+        
+        if len(store) < collection.count():
+            existing = collection.get(include=["embeddings"])
+            store.add(existing["ids"], np.asarray(existing["embeddings"], dtype=np.float32))
+            logger.info(f"Backfilled {VECTOR_STORE_DTYPE} vector store for {collection_name}: {len(store)} vectors")
+        
+        return store
+    
+    def drop_vector_store(self, collection_name: str):
+        """Forget and delete a collection's vector stores in every precision"""
+        self.vector_stores.pop(collection_name, None)
+        for dtype in ("int8", "float16"):
+            VectorStore(self.vector_store_path(collection_name, dtype), dtype).delete()
+    
     async def add_documents(self, documents: List[Document], collection_name: str = "default"):
         """Add documents to vector database"""
         try:
             collection = self.get_or_create_collection(collection_name)
+            vector_store = self.vector_stores[collection_name]
             
-            # Prepare data for insertion
-            ids = [doc.id for doc in documents]
-            contents = [doc.content for doc in documents]
-            metadatas = [doc.metadata or {} for doc in documents]
+            # Order by token length so each chunk pads to a similar length
+            lengths = (await asyncio.to_thread(
+                self.embedder.tokenizer, [doc.content for doc in documents], return_length=True
+            ))["length"]
+            order = sorted(range(len(documents)), key=lengths.__getitem__)
+            chunks = [
+                [documents[i] for i in order[start:start + ADD_CHUNK_SIZE]]
+                for start in range(0, len(order), ADD_CHUNK_SIZE)
+            ]
             
-            # Generate embeddings
-            embeddings = self.embedder.encode(contents).tolist()
+            def store_chunk(chunk: List[Document], embeddings: np.ndarray):
+                ids = [doc.id for doc in chunk]
+                # chromadb 0.4 only accepts nested lists, so convert once at the boundary
+                collection.add(
+                    embeddings=embeddings.tolist(),
+                    documents=[doc.content for doc in chunk],
+                    metadatas=[doc.metadata or {} for doc in chunk],
+                    ids=ids
+                )
+                vector_store.add(ids, embeddings)
             
-            # Add to collection
-            collection.add(
-                embeddings=embeddings,
-                documents=contents,
-                metadatas=metadatas,
-                ids=ids
-            )
+            # Pipeline the chunks: the next chunk embeds while the current one is
+            # written, so at most two chunks' embeddings are held at once
+            pending = asyncio.create_task(self.embed([doc.content for doc in chunks[0]])) if chunks else None
+            try:
+                for index, chunk in enumerate(chunks):
+                    embeddings = await pending
+                    if index + 1 < len(chunks):
+                        pending = asyncio.create_task(self.embed([doc.content for doc in chunks[index + 1]]))
+                    await asyncio.to_thread(store_chunk, chunk, embeddings)
+            finally:
+                if pending and not pending.done():
+                    pending.cancel()
             
             logger.info(f"Added {len(documents)} documents to collection {collection_name}")
             return {"status": "success", "added": len(documents)}
@@ -149,32 +437,63 @@ class VectorManager:
         try:
             collection = self.get_or_create_collection(request.collection_name)
             
-            # Generate query embedding
-            query_embedding = self.embedder.encode([request.query]).tolist()[0]
+            # Generate query embedding, or reuse it for a repeated query
+            cache_key = (self.embedder_backend, request.query)
+            query_embedding = self.query_cache.get(cache_key)
+            if query_embedding is None:
+                query_embedding = (await self.embed([request.query]))[0]
+                query_embedding.setflags(write=False)
+                self.query_cache[cache_key] = query_embedding
             
-            # Search collection
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=request.n_results,
-                include=['documents', 'metadatas', 'distances']
-            )
+            vector_store = self.vector_stores[request.collection_name]
+            
+            results = None
+            if simsimd is not None and 0 < len(vector_store) <= BRUTE_FORCE_MAX:
+                ids, cosine_distances = await asyncio.to_thread(
+                    vector_store.search, query_embedding, request.n_results
+                )
+                fetched = collection.get(ids=ids, include=['documents', 'metadatas'])
+                by_id = dict(zip(fetched['ids'], zip(fetched['documents'], fetched['metadatas'])))
+                
+                if len(by_id) == len(ids):
+                    # Embeddings are unit length, so Chroma's squared L2 distance is 2 * cosine distance
+                    results = {
+                        'ids': [ids],
+                        'documents': [[by_id[doc_id][0] for doc_id in ids]],
+                        'metadatas': [[by_id[doc_id][1] for doc_id in ids]],
+                        'distances': [[2.0 * distance for distance in cosine_distances]]
+                    }
+                else:
+                    # The store holds ids Chroma no longer has (an out-of-band delete
+                    # or a failed add); let Chroma answer this query instead
+                    logger.warning(f"Vector store for {request.collection_name} is out of sync with Chroma; "
+                                   f"{len(ids) - len(by_id)} result id(s) missing")
+            
+            if results is None:
+                # Search collection
+                results = collection.query(
+                    query_embeddings=[query_embedding.tolist()],
+                    n_results=request.n_results,
+                    include=['documents', 'metadatas', 'distances']
+                )
             
             # Format results
             documents = []
             similarities = []
             
             if results['documents'] and results['documents'][0]:
-                for i, doc in enumerate(results['documents'][0]):
-                    documents.append({
-                        "id": results['ids'][0][i] if results['ids'] else f"doc_{i}",
-                        "content": doc,
-                        "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
-                        "distance": results['distances'][0][i] if results['distances'] else 0.0
-                    })
-                    
-                    # Convert distance to similarity (lower distance = higher similarity)
-                    similarity = 1.0 - (results['distances'][0][i] if results['distances'] else 0.0)
-                    similarities.append(max(0.0, similarity))
+                docs = results['documents'][0]
+                ids = results['ids'][0] if results['ids'] else [f"doc_{i}" for i in range(len(docs))]
+                metas = results['metadatas'][0] if results['metadatas'] else [{}] * len(docs)
+                distances = results['distances'][0] if results['distances'] else [0.0] * len(docs)
+                
+                documents = [
+                    {"id": doc_id, "content": doc, "metadata": meta, "distance": distance}
+                    for doc_id, doc, meta, distance in zip(ids, docs, metas, distances)
+                ]
+                
+                # Convert distance to similarity (lower distance = higher similarity)
+                similarities = np.clip(1.0 - np.asarray(distances, dtype=np.float64), 0.0, None).tolist()
             
             return SearchResult(
                 documents=documents,
@@ -213,8 +532,16 @@ class VectorManager:
                 "total_documents": 0
             }
 
-# Initialize vector manager
-vector_manager = VectorManager()
+# Vector manager, created per worker process at startup so the launcher
+# process never loads the embedder itself
+vector_manager: Optional[VectorManager] = None
+
+@app.on_event("startup")
+async def startup_event():
+    """Initialize the vector manager and start the embedding batcher"""
+    global vector_manager
+    vector_manager = VectorManager()
+    vector_manager.start_batcher()
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -255,6 +582,7 @@ async def delete_collection(collection_name: str):
         vector_manager.client.delete_collection(collection_name)
         if collection_name in vector_manager.collections:
             del vector_manager.collections[collection_name]
+        vector_manager.drop_vector_store(collection_name)
         
         return {"status": "success", "message": f"Collection {collection_name} deleted"}
     except Exception as e:
@@ -272,5 +600,10 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=False,
-        log_level="info"
+        # Chroma and the vector store files are single-writer; only raise this for read-heavy deployments
+        workers=int(os.getenv("VECTOR_WORKERS", 1)),
+        log_level="info",
+        loop="auto",
+        http="auto",
+        interface="asgi3"
     )
\ No newline at end of file
@@ -2,13 +2,16 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import docker
-import json
+import orjson
 import os
+import re
 import logging
 from datetime import datetime
+from collections import OrderedDict
 from typing import List, Dict, Optional
 import asyncio
 import aiohttp
+from blake3 import blake3
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +37,11 @@ app.add_middleware(
 MODELS_PATH = os.getenv("MODELS_PATH", "/models")
 LOGS_PATH = os.getenv("LOGS_PATH", "/logs")
 MCP_PORT = int(os.getenv("MCP_PORT", "8600"))
+# Optional Docker label (e.g. "gomini.model=true") so the daemon filters containers for us
+MODEL_LABEL = os.getenv("MCP_MODEL_LABEL")
+
+# Known model names, matched against image tag and container name
+MODEL_PATTERN = re.compile(r"gemma|mistral|qwen|smollm|ollama")
 
 # Docker client
 try:
@@ -72,14 +80,20 @@ class HealthResponse(BaseModel):
 
 # Model registry
 model_registry = {}
-inference_cache = {}
+inference_cache: "OrderedDict[str, dict]" = OrderedDict()  # LRU order, oldest first
+
+def write_json_atomic(path: str, data):
+    """Write compact JSON to a temp file and swap it in, so a crash never leaves a torn file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+    os.replace(tmp_path, path)
 
 def save_registry():
     """Save model registry to disk"""
     try:
         registry_path = os.path.join(LOGS_PATH, "mcp-model-registry.json")
-        with open(registry_path, 'w') as f:
-            json.dump(model_registry, f, indent=2)
+        write_json_atomic(registry_path, model_registry)
         logger.info(f"Model registry saved to {registry_path}")
     except Exception as e:
         logger.error(f"Failed to save registry: {e}")
@@ -90,48 +104,68 @@ def load_registry():
     try:
         registry_path = os.path.join(LOGS_PATH, "mcp-model-registry.json")
         if os.path.exists(registry_path):
-            with open(registry_path, 'r') as f:
-                model_registry = json.load(f)
+            with open(registry_path, 'rb') as f:
+                model_registry = orjson.loads(f.read())
             logger.info(f"Model registry loaded from {registry_path}")
     except Exception as e:
         logger.error(f"Failed to load registry: {e}")
 
+def save_inference_cache():
+    """Save inference cache to disk so warm entries survive restarts"""
+    try:
+        cache_path = os.path.join(LOGS_PATH, "mcp-inference-cache.json")
+        write_json_atomic(cache_path, inference_cache)
+        logger.info(f"Inference cache saved to {cache_path} ({len(inference_cache)} entries)")
+    except Exception as e:
+        logger.error(f"Failed to save inference cache: {e}")
+
+def load_inference_cache():
+    """Load inference cache from disk"""
+    global inference_cache
+    try:
+        cache_path = os.path.join(LOGS_PATH, "mcp-inference-cache.json")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                inference_cache = OrderedDict(orjson.loads(f.read()))
+            logger.info(f"Inference cache loaded from {cache_path} ({len(inference_cache)} entries)")
+    except Exception as e:
+        logger.error(f"Failed to load inference cache: {e}")
+
 def detect_model_containers():
     """Detect existing model containers"""
     if not docker_client:
         return []
     
     model_containers = []
-    model_images = ["gemma", "mistral", "qwen", "smollm", "ollama"]
+    filters = {"label": MODEL_LABEL} if MODEL_LABEL else None
     
     try:
-        for container in docker_client.containers.list(all=True):
+        for container in docker_client.containers.list(all=True, filters=filters):
             image_name = container.image.tags[0] if container.image.tags else "unknown"
-            container_name = container.name.lower()
             
             # Check if container is a known model
-            for model in model_images:
-                if model in image_name.lower() or model in container_name:
-                    model_info = {
-                        "name": container.name,
-                        "container_id": container.id[:12],
-                        "status": container.status,
-                        "image": image_name,
-                        "created": container.attrs["Created"][:19]
-                    }
-                    
-                    # Try to extract port mapping
-                    try:
-                        if container.ports:
-                            for port_config in container.ports.values():
-                                if port_config:
-                                    model_info["port"] = int(port_config[0]["HostPort"])
-                                    break
-                    except:
-                        pass
-                    
-                    model_containers.append(model_info)
-                    break
+            if not MODEL_PATTERN.search(f"{image_name} {container.name}".lower()):
+                continue
+            
+            model_info = {
+                "name": container.name,
+                "container_id": container.id[:12],
+                "status": container.status,
+                "image": image_name,
+                "created": container.attrs["Created"][:19]
+            }
+            
+            # Try to extract port mapping
+            try:
+                if container.ports:
+                    for port_config in container.ports.values():
+                        if port_config:
+                            model_info["port"] = int(port_config[0]["HostPort"])
+                            break
+            except:
+                pass
+            
+            model_containers.append(model_info)
         
         logger.info(f"Detected {len(model_containers)} model containers")
         return model_containers
@@ -148,11 +182,17 @@ async def startup_event():
     # Create logs directory if needed
     os.makedirs(LOGS_PATH, exist_ok=True)
     
-    # Load existing registry
+    # One pooled HTTP session for all calls to model containers
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+    )
+    
+    # Load existing registry and cached responses
     load_registry()
+    load_inference_cache()
     
-    # Detect and register model containers
-    model_containers = detect_model_containers()
+    # Detect and register model containers (docker-py is blocking, keep it off the event loop)
+    model_containers = await asyncio.to_thread(detect_model_containers)
     for model in model_containers:
         model_registry[model["name"]] = model
     
@@ -161,6 +201,12 @@ async def startup_event():
     
     logger.info(f"MCP Hub started with {len(model_registry)} models registered")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist the inference cache and close the shared HTTP session"""
+    save_inference_cache()
+    await app.state.http.close()
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -196,7 +242,7 @@ async def register_model(model: ModelInfo):
 @app.post("/models/scan")
 async def scan_models():
     """Scan for new model containers"""
-    model_containers = detect_model_containers()
+    model_containers = await asyncio.to_thread(detect_model_containers)
     new_models = 0
     
     for model in model_containers:
@@ -211,9 +257,10 @@ async def scan_models():
 @app.post("/generate", response_model=GenerateResponse)
 async def generate_text(request: GenerateRequest):
     """Generate text using specified model"""
-    # Check cache first
-    cache_key = f"{request.model}:{hash(request.prompt)}"
+    # Check cache first (BLAKE3 keys are stable across processes, unlike hash())
+    cache_key = f"{request.model}:{blake3(request.prompt.encode()).hexdigest()}"
     if cache_key in inference_cache:
+        inference_cache.move_to_end(cache_key)
         cached_response = inference_cache[cache_key]
         logger.info(f"Returning cached response for {request.model}")
         return GenerateResponse(
@@ -231,8 +278,8 @@ async def generate_text(request: GenerateRequest):
     
     # Simulate inference (replace with actual model inference)
     try:
-        # This would normally call the actual model container
-        # For now, simulate response
+        # This would normally call the actual model container through the
+        # shared app.state.http session. For now, simulate response
         simulated_response = f"[{request.model}] Generated response for: {request.prompt[:50]}..."
         
         # Cache the response
@@ -241,12 +288,9 @@ async def generate_text(request: GenerateRequest):
             "timestamp": datetime.now().isoformat()
         }
         
-        # Limit cache size
+        # Limit cache size by evicting the least recently used entry
         if len(inference_cache) > 1000:
-            # Remove oldest entries
-            oldest_keys = list(inference_cache.keys())[:100]
-            for key in oldest_keys:
-                del inference_cache[key]
+            inference_cache.popitem(last=False)
         
         logger.info(f"Generated text using {request.model}")
         return GenerateResponse(
@@ -271,7 +315,7 @@ async def get_model_status(model_name: str):
     # Check container status if Docker client available
     if docker_client:
         try:
-            container = docker_client.containers.get(model_info["container_id"])
+            container = await asyncio.to_thread(docker_client.containers.get, model_info["container_id"])
             model_info["current_status"] = container.status
         except Exception as e:
             model_info["current_status"] = "unknown"
@@ -304,10 +348,18 @@ async def clear_cache():
     """Clear inference cache"""
     global inference_cache
     cache_size = len(inference_cache)
-    inference_cache = {}
+    inference_cache = OrderedDict()
     logger.info(f"Cleared inference cache ({cache_size} entries)")
     return {"status": "cleared", "entries_removed": cache_size}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=MCP_PORT)
\ No newline at end of file
+    # The registry and inference cache live in process memory, so keep one worker unless MCP_WORKERS says otherwise
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=MCP_PORT,
+        workers=int(os.getenv("MCP_WORKERS", 1)),
+        loop="auto",
+        http="auto"
+    )
\ No newline at end of file
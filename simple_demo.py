@@ -5,7 +5,6 @@ Pure Streamlit demo without pandas/dataframes to avoid pyarrow dependency
 
 import os
 import sys
-import time
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -59,9 +58,9 @@ def main():
     print("Press Ctrl+C to shutdown...")
     
     try:
-        # Keep running until interrupted
-        while True:
-            time.sleep(1)
+        # Keep running until Streamlit exits or we are interrupted
+        streamlit_process.wait()
+        print("⚠️ Streamlit process ended")
     except KeyboardInterrupt:
         print("\n🛑 Shutting down demo...")
         
@@ -8,7 +8,19 @@ import sys
 import os
 import time
 import signal
+import threading
 from pathlib import Path
+from importlib.util import find_spec
+
+# Ctrl+C can't interrupt an untimed wait on Windows, so wake there once a second;
+# elsewhere the main thread blocks until a signal arrives
+WAIT_TIMEOUT = 1 if os.name == 'nt' else None
+
+def watch_process(name, process, stopping):
+    """Block until a child exits and report it unless we are shutting down"""
+    process.wait()
+    if not stopping.is_set():
+        print(f"⚠️ {name} process ended unexpectedly")
 
 def run_command(cmd, name, cwd=None):
     """Run a command and return the process"""
@@ -17,8 +29,7 @@ def run_command(cmd, name, cwd=None):
         process = subprocess.Popen(
             cmd,
             cwd=cwd,
-            creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0,
-            shell=True
+            creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0
         )
         print(f"✅ {name} started (PID: {process.pid})")
         return process
@@ -29,13 +40,8 @@ def run_command(cmd, name, cwd=None):
 def check_dependencies():
     """Check if required dependencies are installed"""
     required_packages = ['streamlit', 'pandas', 'plotly', 'requests', 'pyodbc']
-    missing = []
-    
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing.append(package)
+    # find_spec only locates the package; importing pandas/pyodbc here would cost seconds
+    missing = [package for package in required_packages if find_spec(package) is None]
     
     if missing:
         print(f"❌ Missing dependencies: {', '.join(missing)}")
@@ -85,6 +91,7 @@ def main():
     app_dir = Path(__file__).parent / "app"
     
     processes = []
+    stopping = threading.Event()
     
     try:
         # Use virtual environment Python
@@ -92,7 +99,7 @@ def main():
         python_cmd = str(venv_python) if venv_python.exists() else "python"
         
         # Start FastAPI backend
-        fastapi_cmd = f"{python_cmd} -m uvicorn app:app --host 127.0.0.1 --port 8000 --reload"
+        fastapi_cmd = [python_cmd, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", "8000", "--reload"]
         fastapi_process = run_command(fastapi_cmd, "FastAPI Backend", cwd=app_dir)
         if fastapi_process:
             processes.append(("FastAPI", fastapi_process))
@@ -101,7 +108,7 @@ def main():
         time.sleep(3)
         
         # Start Streamlit dashboard
-        streamlit_cmd = f"{python_cmd} -m streamlit run headquarters.py --server.port 8501 --server.address 127.0.0.1"
+        streamlit_cmd = [python_cmd, "-m", "streamlit", "run", "headquarters.py", "--server.port", "8501", "--server.address", "127.0.0.1"]
         streamlit_process = run_command(streamlit_cmd, "Streamlit Dashboard", cwd=app_dir)
         if streamlit_process:
             processes.append(("Streamlit", streamlit_process))
@@ -109,7 +116,7 @@ def main():
         # Optionally start MSSQL sync daemon
         sync_choice = input("\n🔄 Start MSSQL sync daemon? (y/N): ").lower().strip()
         if sync_choice in ['y', 'yes']:
-            sync_cmd = f"{python_cmd} mssql_sync.py daemon"
+            sync_cmd = [python_cmd, "mssql_sync.py", "daemon"]
             sync_process = run_command(sync_cmd, "MSSQL Sync Daemon", cwd=app_dir)
             if sync_process:
                 processes.append(("MSSQL Sync", sync_process))
@@ -130,14 +137,13 @@ def main():
         print(f"\n✅ {len(processes)} services running")
         print("Press Ctrl+C to shutdown all services...")
         
+        # Each child gets a watcher thread that reports if it dies
+        for name, process in processes:
+            threading.Thread(target=watch_process, args=(name, process, stopping), daemon=True).start()
+        
         # Wait for interruption
-        while True:
-            time.sleep(1)
-            
-            # Check if any process died
-            for name, process in processes:
-                if process.poll() is not None:
-                    print(f"⚠️ {name} process ended unexpectedly")
+        while not stopping.wait(WAIT_TIMEOUT):
+            pass
     
     except KeyboardInterrupt:
         print("\n🛑 Shutdown requested...")
@@ -147,6 +153,7 @@ def main():
     
     finally:
         # Cleanup processes
+        stopping.set()
         print("🔄 Stopping services...")
         for name, process in processes:
             try:
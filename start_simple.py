@@ -8,8 +8,12 @@ import subprocess
 import sys
 import os
 import time
+import threading
 from pathlib import Path
 
+# Upper bound on how long option 3 holds the dashboard back for the backend
+BACKEND_START_TIMEOUT = 15
+
 def main():
     print("🚀 Starting GentleΩ Production System...")
     
@@ -33,44 +37,59 @@ def main():
     print("3. Both services")
     
     choice = input("\nEnter choice (1-3): ").strip()
+    server = None
     
     if choice == "1" or choice == "3":
         print("\n🚀 Starting FastAPI Backend...")
-        fastapi_cmd = [
-            sys.executable, "-m", "uvicorn", "app.app:app", 
-            "--host", "127.0.0.1", "--port", "8000", "--reload"
-        ]
+        # uvicorn runs inside this interpreter rather than a fresh "python -m uvicorn"
+        os.environ.update(env)
+        import uvicorn
         
         if choice == "1":
-            # Run in foreground for single service
-            subprocess.run(fastapi_cmd, env=env)
+            # Run in foreground for single service. With reload on, uvicorn's
+            # reloader still serves from a spawned child process; only the
+            # launcher-side interpreter start is saved here
+            uvicorn.run("app.app:app", host="127.0.0.1", port=8000, reload=True)
         else:
-            # Start in background for dual service
-            subprocess.Popen(fastapi_cmd, env=env)
+            # Serve from a background thread for dual service; the reloader needs
+            # the main thread, so this mode runs without --reload
+            server = uvicorn.Server(uvicorn.Config("app.app:app", host="127.0.0.1", port=8000))
+            server_thread = threading.Thread(target=server.run, daemon=True)
+            server_thread.start()
             print("⏳ Waiting for backend to initialize...")
-            time.sleep(10)
-    
-    if choice == "2" or choice == "3":
-        print("\n🚀 Starting Streamlit Dashboard...")
-        streamlit_cmd = [
-            sys.executable, "-m", "streamlit", "run", "app/headquarters.py",
-            "--server.port", "8501", "--server.headless", "true"
-        ]
-        
-        # Streamlit runs in foreground
-        subprocess.run(streamlit_cmd, env=env)
+            deadline = time.monotonic() + BACKEND_START_TIMEOUT
+            while not server.started and server_thread.is_alive() and time.monotonic() < deadline:
+                time.sleep(0.1)
+            if not server.started:
+                print("⚠️  Backend not ready yet - starting dashboard anyway")
     
-    if choice == "3":
-        print("\n🎉 Both services running!")
-        print("🌐 Backend: http://127.0.0.1:8000")
-        print("📊 Dashboard: http://127.0.0.1:8501")
-        print("\nPress Ctrl+C to stop")
+    try:
+        if choice == "2" or choice == "3":
+            print("\n🚀 Starting Streamlit Dashboard...")
+            streamlit_cmd = [
+                sys.executable, "-m", "streamlit", "run", "app/headquarters.py",
+                "--server.port", "8501", "--server.headless", "true"
+            ]
+            
+            # Streamlit runs in foreground
+            subprocess.run(streamlit_cmd, env=env)
         
-        try:
+        if choice == "3":
+            print("\n🎉 Both services running!")
+            print("🌐 Backend: http://127.0.0.1:8000")
+            print("📊 Dashboard: http://127.0.0.1:8501")
+            print("\nPress Ctrl+C to stop")
+            
             while True:
                 time.sleep(10)
-        except KeyboardInterrupt:
-            print("\n🛑 Shutting down...")
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down...")
+    finally:
+        # The in-process backend would die with the interpreter without running
+        # app.py's shutdown hooks; ask it to exit and wait for a clean stop
+        if server is not None:
+            server.should_exit = True
+            server_thread.join()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
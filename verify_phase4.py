@@ -6,18 +6,21 @@ Tests all components without running the full server
 
 import sys
 import os
+# Import app modules by their bare names, as they import each other; going
+# through "app.<module>" as well would load each file twice under two names
 sys.path.append(os.path.join(os.path.dirname(__file__), "app"))
 
 import asyncio
 from datetime import datetime
+from dotenv import load_dotenv
+
+# Parse env/.env once for every check below
+load_dotenv(dotenv_path=os.path.join("env", ".env"))
 
 def test_environment_setup():
     """Test environment configuration"""
     print("🔧 Testing Environment Setup...")
     
-    from dotenv import load_dotenv
-    load_dotenv(dotenv_path=os.path.join("env", ".env"))
-    
     required_vars = [
         "PG_HOST", "PG_PORT", "PG_DB", "PG_USER", "PG_PASSWORD",
         "HF_TOKEN", "OPENAI_BASE_URL", "CHAIN_RPC", "WALLET_ADDRESS"
@@ -39,9 +42,7 @@ def test_database_migration():
     print("🗄️ Testing Database Migration...")
     
     try:
-        from app.psycopg_fix import connect_pg
-        from dotenv import load_dotenv
-        load_dotenv(dotenv_path=os.path.join("env", ".env"))
+        from psycopg_fix import connect_pg
         
         pg = connect_pg(
             os.getenv("PG_HOST", "127.0.0.1"),
@@ -51,46 +52,45 @@ def test_database_migration():
             os.getenv("PG_PASSWORD", "postgres")
         )
         
-        with pg.cursor() as cur:
-            # Check required tables exist
-            cur.execute("""
-                SELECT COUNT(*) FROM information_schema.tables 
-                WHERE table_name IN ('blockchain_ledger', 'pods_poe')
-            """)
-            table_count = cur.fetchone()[0]
-            
-            if table_count >= 2:
-                print("  ✓ Required tables exist")
-                
-                # Check table structure
+        try:
+            with pg.cursor() as cur:
+                # Check required tables exist and read the ledger schema in one round trip
                 cur.execute("""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = 'blockchain_ledger'
+                    SELECT
+                        (SELECT COUNT(*) FROM information_schema.tables
+                         WHERE table_name IN ('blockchain_ledger', 'pods_poe')),
+                        (SELECT array_agg(column_name::text) FROM information_schema.columns
+                         WHERE table_name = 'blockchain_ledger')
                 """)
-                columns = [row[0] for row in cur.fetchall()]
-                
-                required_columns = ['status', 'tx_hash', 'poe_hash', 'block_number']
-                missing = [col for col in required_columns if col not in columns]
+                table_count, columns = cur.fetchone()
+                columns = columns or []
                 
-                if not missing:
-                    print("  ✓ Blockchain ledger schema complete")
-                else:
-                    print(f"  ⚠️ Missing columns: {missing}")
-                
-                # Check migration marker
-                cur.execute("SELECT COUNT(*) FROM blockchain_ledger WHERE poe_hash = 'migration_phase_4_complete'")
-                marker_count = cur.fetchone()[0]
-                
-                if marker_count > 0:
-                    print("  ✓ Phase 4 migration marker found")
-                else:
-                    print("  ⚠️ Migration marker not found")
+                if table_count >= 2:
+                    print("  ✓ Required tables exist")
                     
-            else:
-                print(f"  ❌ Only {table_count}/2 required tables found")
-                return False
-                
-        pg.close()
+                    required_columns = ['status', 'tx_hash', 'poe_hash', 'block_number']
+                    missing = [col for col in required_columns if col not in columns]
+                    
+                    if not missing:
+                        print("  ✓ Blockchain ledger schema complete")
+                    else:
+                        print(f"  ⚠️ Missing columns: {missing}")
+                    
+                    # Check migration marker (kept separate: it would fail to parse if the table were missing)
+                    cur.execute("SELECT COUNT(*) FROM blockchain_ledger WHERE poe_hash = 'migration_phase_4_complete'")
+                    marker_count = cur.fetchone()[0]
+                    
+                    if marker_count > 0:
+                        print("  ✓ Phase 4 migration marker found")
+                    else:
+                        print("  ⚠️ Migration marker not found")
+                        
+                else:
+                    print(f"  ❌ Only {table_count}/2 required tables found")
+                    return False
+        finally:
+            pg.close()
+        
         print("✅ Database migration verified\n")
         return True
         
@@ -104,7 +104,7 @@ def test_blockchain_client():
     print("⛓️ Testing Blockchain Client...")
     
     try:
-        from app.blockchain_client import ping_rpc, get_chain_head, push_to_chain
+        from blockchain_client import ping_rpc, get_chain_head, push_to_chain
         
         # Test RPC connectivity (simulation mode expected)
         rpc_ok, latency = ping_rpc()
@@ -136,7 +136,7 @@ async def test_chain_orchestrator():
     print("🔄 Testing Chain Orchestrator...")
     
     try:
-        from app.chain_orchestrator import run_single_cycle, get_orchestrator_stats
+        from chain_orchestrator import run_single_cycle, get_orchestrator_stats
         
         # Test orchestrator stats
         stats = await get_orchestrator_stats()
@@ -163,7 +163,7 @@ async def test_pod_poe_flow():
     print("🔄 Testing PoD → PoE Flow...")
     
     try:
-        from app.blockchain_client import record_pod, record_poe
+        from blockchain_client import record_pod, record_poe
         
         # Test PoD recording
         test_data = {
@@ -208,21 +208,29 @@ async def main():
     
     tests = [
         ("Environment Setup", test_environment_setup()),
-        ("Database Migration", test_database_migration()),
-        ("Blockchain Client", test_blockchain_client()),
-        ("Chain Orchestrator", await test_chain_orchestrator()),
-        ("PoD → PoE Flow", await test_pod_poe_flow())
+        ("Database Migration", test_database_migration())
     ]
     
-    passed = 0
-    total = len(tests)
+    # The chain checks all go through the ledger tables, so without a working
+    # database they would only repeat its failure; record them as skipped (None)
+    if tests[-1][1]:
+        tests += [
+            ("Blockchain Client", test_blockchain_client()),
+            ("Chain Orchestrator", await test_chain_orchestrator()),
+            ("PoD → PoE Flow", await test_pod_poe_flow())
+        ]
+    else:
+        print("⏭️ Skipping blockchain checks - database migration failed\n")
+        tests += [(name, None) for name in ("Blockchain Client", "Chain Orchestrator", "PoD → PoE Flow")]
     
-    for test_name, result in tests:
-        if result:
-            passed += 1
+    passed = sum(1 for _, result in tests if result)
+    skipped = [test_name for test_name, result in tests if result is None]
+    total = len(tests)
     
     print("=" * 60)
     print(f"📊 Verification Results: {passed}/{total} tests passed")
+    if skipped:
+        print(f"⏭️ Skipped: {', '.join(skipped)}")
     
     if passed == total:
         print("\n🎉 SUCCESS!")
@@ -233,7 +241,7 @@ async def main():
         print("   📡 PoD → PoE flow operational")
         return True
     else:
-        print(f"\n⚠️  {total - passed} test(s) failed - review configuration")
+        print(f"\n⚠️  {total - passed - len(skipped)} test(s) failed - review configuration")
         return False
 
 